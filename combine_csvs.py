@@ -3,9 +3,113 @@
 Combine all polymarket trade CSVs and remove duplicates.
 """
 
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pandas.api.types import union_categoricals
+
+# Columns written by the collectors and the dtypes to read them with. The
+# heavily repeated string columns are read as categoricals so each distinct
+# value is stored once and dedup/sort work on integer codes.
+DTYPES = {
+    'condition_id': 'category',
+    'question': 'category',
+    'category': 'category',
+    'time_to_resolution_hours': 'float64',
+    'price': 'float64',
+    'size': 'float64',
+    'side': 'category',
+    'outcome': 'category',
+    'won': 'bool',
+    'volume_total': 'float64',
+}
+KEEP_COLS = ['condition_id', 'question', 'category', 'trade_timestamp', 'resolved_at',
+             'time_to_resolution_hours', 'price', 'size', 'side', 'outcome', 'won',
+             'volume_total']
+
+# Files read ahead in background threads while the current one is deduped.
+# Bounds both the thread count and how many unprocessed files sit in memory:
+# each one adds a whole parsed file to peak memory.
+READ_AHEAD = 1
+
+# A trade is unique by: market, timestamp, price, size, side, outcome
+DEDUP_COLS = ['condition_id', 'trade_timestamp', 'price', 'size', 'side', 'outcome']
+
+
+def _read_trades_csv(path: Path) -> pd.DataFrame:
+    """Read one trades CSV with the combine dtypes and a parsed trade_timestamp."""
+    # pyarrow's multi-threaded columnar parser is much faster than the C engine
+    # and parses the timestamp columns during the read
+    df = pd.read_csv(path, engine='pyarrow', dtype=DTYPES, usecols=KEEP_COLS)
+
+    # A column that is empty throughout a file is inferred as float, so its
+    # categories would be float and couldn't be unioned with other files'
+    # string categories
+    for col, dtype in DTYPES.items():
+        if dtype == 'category' and not pd.api.types.is_string_dtype(df[col].cat.categories):
+            df[col] = df[col].cat.rename_categories(df[col].cat.categories.astype(str))
+
+    # pyarrow parses well-formed timestamps itself; fall back to an explicit
+    # ISO8601 parse (cached, since trades share many identical timestamps)
+    if not pd.api.types.is_datetime64_any_dtype(df['trade_timestamp']):
+        df['trade_timestamp'] = pd.to_datetime(
+            df['trade_timestamp'], format='ISO8601', cache=True, utc=True)
+
+    # pyarrow picks the unit per file (seconds unless a file has sub-second
+    # timestamps), and the dedup hashes the raw integers, so use one unit
+    df['trade_timestamp'] = df['trade_timestamp'].dt.as_unit('ns')
+    return df
+
+
+def _read_in_order(paths: list):
+    """
+    Yield (path, frame) for each trades CSV in order, reading up to
+    READ_AHEAD files ahead in a thread pool.
+
+    The pyarrow parser releases the GIL, so reading the next files overlaps
+    with deduplicating the current one.
+    """
+    with ThreadPoolExecutor(max_workers=min(READ_AHEAD, len(paths))) as pool:
+        pending = deque()
+        for path in paths:
+            pending.append((path, pool.submit(_read_trades_csv, path)))
+            if len(pending) > READ_AHEAD:
+                done_path, future = pending.popleft()
+                yield done_path, future.result()
+        while pending:
+            done_path, future = pending.popleft()
+            yield done_path, future.result()
+
+
+def _concat_with_categories(dfs: list) -> pd.DataFrame:
+    """
+    Concatenate frames with categorical columns.
+
+    pd.concat falls back to object dtype when categories differ between
+    frames, so the categories are unified across all frames first.
+    """
+    cat_cols = [col for col in dfs[0].columns
+                if isinstance(dfs[0][col].dtype, pd.CategoricalDtype)]
+    categories = {col: union_categoricals([df[col] for df in dfs]).categories
+                  for col in cat_cols}
+    dfs = [df.assign(**{col: df[col].cat.set_categories(categories[col]) for col in cat_cols})
+           for df in dfs]
+    return pd.concat(dfs, ignore_index=True)
+
+
+def _row_hashes(df: pd.DataFrame, cols: list) -> np.ndarray:
+    """
+    Hash the given columns into a single uint64 per row.
+
+    Categoricals are hashed by value rather than by code, so the same trade
+    hashes the same in every file whatever each file's categories are.
+    NaNs hash equal, as drop_duplicates treats them; a 64-bit collision
+    between distinct trades is vanishingly unlikely at these row counts.
+    """
+    return pd.util.hash_pandas_object(df[cols], index=False).to_numpy()
 
 
 def combine_csvs(data_dir: str = "polymarket_data", output_name: str = None):
@@ -14,7 +118,8 @@ def combine_csvs(data_dir: str = "polymarket_data", output_name: str = None):
 
     Args:
         data_dir: Directory containing the CSV files
-        output_name: Output filename (default: polymarket_trades_combined_YYYYMMDD.csv)
+        output_name: Output filename (default: polymarket_trades_combined_YYYYMMDD.parquet).
+                     A .csv name writes CSV instead of Parquet.
     """
     data_path = Path(data_dir)
     csv_files = sorted(data_path.glob("polymarket_trades_*.csv"))
@@ -28,44 +133,64 @@ def combine_csvs(data_dir: str = "polymarket_data", output_name: str = None):
         size_mb = f.stat().st_size / (1024 * 1024)
         print(f"  {f.name} ({size_mb:.1f} MB)")
 
-    # Read and combine all CSVs
+    # Read the files one at a time and keep only rows not already seen, so
+    # while reading, peak memory is the unique rows plus the file being
+    # deduped and READ_AHEAD files being parsed, rather than every input row.
+    # Concatenating the kept pieces at the end briefly holds the unique rows
+    # twice. Each file's dedup columns are hashed once, and only the hashes
+    # of kept rows are carried forward.
     print(f"\nReading files...")
-    dfs = []
-    for f in csv_files:
-        print(f"  Loading {f.name}...")
-        df = pd.read_csv(f)
-        df['source_file'] = f.name  # Track source for debugging
-        dfs.append(df)
-        print(f"    {len(df):,} rows")
-
-    combined = pd.concat(dfs, ignore_index=True)
-    print(f"\nTotal rows before dedup: {len(combined):,}")
-
-    # Define columns that uniquely identify a trade
-    # A trade is unique by: market, timestamp, price, size, side, outcome
-    dedup_cols = ['condition_id', 'trade_timestamp', 'price', 'size', 'side', 'outcome']
-
-    # Check for duplicates
-    n_dupes = combined.duplicated(subset=dedup_cols).sum()
+    pieces = []
+    seen = set()  # hashes of the unique rows kept so far
+    total_rows = 0
+    for f, df in _read_in_order(csv_files):
+        print(f"  Loaded {f.name}")
+        total_rows += len(df)
+
+        # Keep the first occurrence of each trade: the first within this
+        # file, and only if no earlier file had it. Lookups in and additions
+        # to the set cost time in proportion to this file alone.
+        hashes = _row_hashes(df, DEDUP_COLS)
+        is_new = ~pd.Series(hashes).duplicated().to_numpy()
+        is_new &= np.fromiter((h not in seen for h in hashes.tolist()),
+                              dtype=bool, count=len(hashes))
+        new_idx = np.flatnonzero(is_new)
+        seen.update(hashes[new_idx].tolist())
+
+        pieces.append(df.iloc[new_idx])
+        print(f"    {len(df):,} rows ({len(new_idx):,} new)")
+    del seen
+
+    combined_deduped = _concat_with_categories(pieces)
+    del pieces
+
+    n_dupes = total_rows - len(combined_deduped)
+    print(f"\nTotal rows before dedup: {total_rows:,}")
     print(f"Duplicate rows found: {n_dupes:,}")
-
-    # Remove duplicates (keep first occurrence)
-    combined_deduped = combined.drop_duplicates(subset=dedup_cols, keep='first')
     print(f"Total rows after dedup: {len(combined_deduped):,}")
 
-    # Drop the source_file column (was just for debugging)
-    combined_deduped = combined_deduped.drop(columns=['source_file'])
-
-    # Sort by trade timestamp
-    combined_deduped = combined_deduped.sort_values('trade_timestamp').reset_index(drop=True)
+    # Sort by trade timestamp: a stable argsort over the raw int64 epoch values
+    # rather than sort_values on the datetime column. NaT is stored as the
+    # smallest int64, so push it to the end as sort_values would.
+    timestamps = combined_deduped['trade_timestamp']
+    ts = np.where(timestamps.isna().to_numpy(), np.iinfo(np.int64).max,
+                  timestamps.array.asi8)
+    order = np.argsort(ts, kind='stable')
+    combined_deduped = combined_deduped.iloc[order].reset_index(drop=True)
 
     # Generate output filename
     if output_name is None:
         timestamp = datetime.now().strftime('%Y%m%d')
-        output_name = f"polymarket_trades_combined_{timestamp}.csv"
+        output_name = f"polymarket_trades_combined_{timestamp}.parquet"
 
+    # Parquet keeps the dtypes (categoricals, tz-aware timestamps) and loads
+    # far faster than re-parsing a CSV
     output_path = data_path / output_name
-    combined_deduped.to_csv(output_path, index=False)
+    if output_path.suffix == '.csv':
+        combined_deduped.to_csv(output_path, index=False)
+    else:
+        combined_deduped.to_parquet(output_path, engine='pyarrow', compression='zstd',
+                                    row_group_size=256_000, index=False)
 
     size_mb = output_path.stat().st_size / (1024 * 1024)
     print(f"\nSaved to: {output_path}")
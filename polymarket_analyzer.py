@@ -5,30 +5,234 @@ Analyzes the relationship between purchase price and win probability
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy import stats
 from pathlib import Path
 from typing import Optional, Tuple
 
+try:
+    import numba
+except ImportError:  # optional: only speeds up very fine binnings
+    numba = None
+
+# z-score for a two-sided 95% confidence interval, scipy.stats.norm.ppf(0.975)
+Z95 = 1.959963984540054
+
+
+def _wilson_confidence_interval(successes: np.ndarray,
+                                n: np.ndarray,
+                                z: float = Z95) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calculate Wilson score confidence intervals for arrays of counts
+    More accurate than normal approximation for proportions
+    """
+    successes = np.asarray(successes, dtype=np.float64)
+    n = np.asarray(n, dtype=np.float64)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = successes / n
+        denominator = 1 + z**2 / n
+        center = (p + z**2 / (2*n)) / denominator
+        margin = z * np.sqrt(p*(1-p)/n + z**2/(4*n**2)) / denominator
+    
+    empty = n == 0
+    ci_low = np.where(empty, 0, np.clip(center - margin, 0, 1))
+    ci_high = np.where(empty, 0, np.clip(center + margin, 0, 1))
+    return ci_low, ci_high
+
+
+# Above this many price bins, use the fused numba kernel when available
+NUMBA_MIN_BINS = 200
+
+if numba is not None:
+    @numba.njit(parallel=True)
+    def _bin_stats_numba(price, won, edges):
+        """
+        Assign right-closed bin codes (first bin includes its left edge) and
+        count trades and wins per bin in one parallel pass. Each thread fills
+        its own row of the count arrays, which are summed at the end.
+        """
+        n_bins = edges.size - 1
+        n_chunks = numba.get_num_threads()
+        chunk = (price.size + n_chunks - 1) // n_chunks
+        codes = np.full(price.size, -1, dtype=np.intp)
+        counts = np.zeros((n_chunks, n_bins), dtype=np.int64)
+        wins = np.zeros((n_chunks, n_bins), dtype=np.float64)
+        
+        for c in numba.prange(n_chunks):
+            for i in range(c * chunk, min((c + 1) * chunk, price.size)):
+                p = price[i]
+                if np.isnan(p) or p < edges[0] or p > edges[n_bins]:
+                    continue
+                b = max(np.searchsorted(edges, p) - 1, 0)
+                codes[i] = b
+                counts[c, b] += 1
+                wins[c, b] += won[i]
+        
+        return codes, counts.sum(axis=0), wins.sum(axis=0)
+else:
+    _bin_stats_numba = None
+
+
+# Columns loaded whatever subset is requested: the BUY filter, market counts
+# and the calibration arrays read them
+CORE_COLUMNS = ['condition_id', 'side', 'outcome', 'price', 'won']
+
+# x (and y) values of the perfect calibration diagonal, shared by every plot
+X_PERFECT = np.linspace(0, 100, 100)
+
+
+def _plot_calibration(ax, results: pd.DataFrame, color: str, alpha: float = 0.3,
+                      ci_label: Optional[str] = None, **line_kwargs):
+    """Plot observed win rate vs price with its shaded 95% confidence band"""
+    x = results['price_midpoint'] * 100
+    ax.plot(x, results['win_rate'] * 100, 'o-', color=color, **line_kwargs)
+    ax.fill_between(x, results['ci_low'] * 100, results['ci_high'] * 100,
+                    alpha=alpha, color=color, label=ci_label)
+
+
+def _plot_perfect_calibration(ax, **line_kwargs):
+    """Plot the dashed perfect calibration diagonal"""
+    ax.plot(X_PERFECT, X_PERFECT, '--', color='#2ecc71', **line_kwargs)
+
+
+def _plot_calibration_panel(ax, results: pd.DataFrame, title: str):
+    """Draw one small calibration panel of a 2x3 breakdown figure"""
+    _plot_calibration(ax, results, '#e31e24', linewidth=2, markersize=5)
+    _plot_perfect_calibration(ax, linewidth=1.5, alpha=0.7)
+    
+    ax.set_xlim(0, 100)
+    ax.set_ylim(0, 100)
+    ax.grid(True, alpha=0.3)
+    ax.set_xlabel('Price (¢)', fontsize=10)
+    ax.set_ylabel('Win %', fontsize=10)
+    ax.set_title(title, fontsize=11, fontweight='bold')
+
+
 class PolymarketAnalyzer:
     """
     Analyzer for Polymarket trading data
     """
     
-    def __init__(self, data_file: str):
+    def __init__(self, data_file: str, columns: Optional[list] = None):
         """
         Args:
-            data_file: Path to CSV file with trade data
+            data_file: Path to CSV or Parquet file with trade data
+            columns: Only load these columns, plus the ones every analysis
+                     needs (condition_id, side, outcome, price, won), which
+                     are always loaded. Default: all
         """
-        self.df = pd.read_csv(data_file)
-        self.df['trade_timestamp'] = pd.to_datetime(self.df['trade_timestamp'])
+        if columns is not None:
+            columns = list(dict.fromkeys([*CORE_COLUMNS, *columns]))
+        
+        if Path(data_file).suffix == '.parquet':
+            # Parquet stores trade_timestamp already typed
+            self.df = pd.read_parquet(data_file, engine='pyarrow', columns=columns)
+        else:
+            self.df = pd.read_csv(data_file, usecols=columns)
+            if 'trade_timestamp' in self.df:
+                # Timestamps are all ISO 8601 and heavily repeated, so parse with an
+                # explicit format and let the cache convert each distinct string once
+                self.df['trade_timestamp'] = pd.to_datetime(
+                    self.df['trade_timestamp'], format='ISO8601', cache=True, utc=True)
+        
+        # The string columns repeat a few thousand values across millions of
+        # trades: as categoricals each value is stored once, and per-market
+        # counting works on int codes instead of strings
+        for col in ['condition_id', 'question', 'category', 'side', 'outcome']:
+            if col in self.df:
+                self.df[col] = self.df[col].astype('category')
         
         # Filter to only BUY orders (we want to know: did what I bought win?)
-        self.df = self.df[self.df['side'] == 'BUY'].copy()
+        # Nothing writes to the filtered frame, so no defensive copy is needed
+        self.df = self.df.loc[self.df['side'].eq('BUY')]
         
         print(f"Loaded {len(self.df)} BUY trades from {self.df['condition_id'].nunique()} markets")
     
+    @property
+    def df(self) -> pd.DataFrame:
+        """
+        The BUY trades being analyzed
+        
+        Win rates and column arrays are cached from this frame. Replace it
+        (analyzer.df = new_df) rather than modifying it in place, or call
+        invalidate() after an in-place change such as analyzer.df['won'] = ...
+        """
+        return self._df
+    
+    @df.setter
+    def df(self, value: pd.DataFrame):
+        # Cached win rates and column arrays belong to the previous frame
+        self._df = value
+        self.invalidate()
+    
+    def invalidate(self):
+        """
+        Drop the cached win rates and column arrays so they are rebuilt from
+        self.df on next use
+        
+        Assigning to self.df does this already; in-place changes to the frame
+        can't be detected, so call it after making one.
+        """
+        self._win_rate_cache = {}
+        self._price = None
+    
+    def _build_arrays(self):
+        """Extract the columns the calibration kernels read as plain numpy arrays"""
+        self._price = self.df['price'].to_numpy(dtype=np.float64)
+        self._won = self.df['won'].to_numpy(dtype=np.float64)
+        self._is_yes = (self.df['outcome'] == 'Yes').to_numpy(dtype=bool)
+        
+        market_ids = self.df['condition_id']
+        if isinstance(market_ids.dtype, pd.CategoricalDtype):
+            self._market_codes = market_ids.cat.codes.to_numpy().astype(np.int64)
+            self._n_market_ids = len(market_ids.cat.categories)
+        else:
+            self._market_codes, markets = pd.factorize(market_ids)
+            self._n_market_ids = len(markets)
+    
+    def _subset(self, mask: np.ndarray) -> 'PolymarketAnalyzer':
+        """
+        Analyzer over the rows selected by a boolean mask or integer positions
+        
+        The subset slices this analyzer's arrays instead of re-extracting
+        them from its frame, and starts with an empty win-rate cache.
+        """
+        if self._price is None:
+            self._build_arrays()
+        
+        subset = PolymarketAnalyzer.__new__(PolymarketAnalyzer)
+        subset.df = self.df.iloc[mask]
+        subset._price = self._price[mask]
+        subset._won = self._won[mask]
+        subset._is_yes = self._is_yes[mask]
+        subset._market_codes = self._market_codes[mask]
+        subset._n_market_ids = self._n_market_ids
+        return subset
+    
+    def _split(self, groups: pd.Categorical, labels: list) -> dict:
+        """
+        Analyzers for the rows in each of the given groups
+        
+        Rows are partitioned with a single stable sort of the group codes,
+        so each subset costs time proportional to its own size rather than
+        a boolean-mask pass over the whole frame per group.
+        
+        Args:
+            groups: Categorical aligned with self.df assigning each row a group
+            labels: Groups to build analyzers for (unknown labels get no rows)
+        
+        Returns:
+            Dict mapping each label to its subset analyzer
+        """
+        codes = np.asarray(groups.codes)
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(groups.categories) + 1))
+        
+        subsets = {}
+        for label, code in zip(labels, groups.categories.get_indexer(labels)):
+            rows = order[bounds[code]:bounds[code + 1]] if code >= 0 else order[:0]
+            subsets[label] = self._subset(rows)
+        return subsets
+    
     def calculate_win_rate_by_price(self, 
                                     price_bins: int = 20,
                                     min_samples: int = 30) -> pd.DataFrame:
@@ -42,59 +246,67 @@ class PolymarketAnalyzer:
         Returns:
             DataFrame with price bins, win rates, and confidence intervals
         """
-        # Create price bins
-        self.df['price_bin'] = pd.cut(
-            self.df['price'], 
-            bins=price_bins,
-            include_lowest=True
-        )
-        
-        # Calculate win rate per bin
-        results = []
-        for price_bin in self.df['price_bin'].cat.categories:
-            bin_data = self.df[self.df['price_bin'] == price_bin]
-            
-            if len(bin_data) < min_samples:
-                continue
-            
-            n = len(bin_data)
-            wins = bin_data['won'].sum()
-            win_rate = wins / n
-            
-            # Calculate 95% confidence interval (Wilson score interval)
-            ci_low, ci_high = self._wilson_confidence_interval(wins, n)
+        # Per-bin stats only depend on the binning; min_samples is applied on
+        # the way out so calls with different thresholds share one pass
+        if price_bins in self._win_rate_cache:
+            results = self._win_rate_cache[price_bins]
+            return results[results['n_trades'] >= min_samples].reset_index(drop=True)
+        
+        if self._price is None:
+            self._build_arrays()
+        price, won = self._price, self._won
+        
+        if _bin_stats_numba is not None and price_bins > NUMBA_MIN_BINS and len(price) > 0:
+            # Edges and labels only depend on the price range, so cut just the
+            # extremes and let the kernel bin every trade
+            price_range = [np.nanmin(price), np.nanmax(price)]
+            price_bin, edges = pd.cut(price_range, bins=price_bins,
+                                      include_lowest=True, retbins=True)
+            intervals = price_bin.categories
+            codes, n, wins = _bin_stats_numba(price, won, edges)
+            valid = codes >= 0
+            codes = codes[valid]
+        else:
+            # Create price bins; the integer codes drive the aggregation and
+            # the interval categories label the output
+            price_bin = pd.cut(
+                price, 
+                bins=price_bins,
+                include_lowest=True
+            )
+            intervals = price_bin.categories
+            codes = price_bin.codes.astype(np.intp)
+            valid = codes >= 0
+            codes = codes[valid]
             
-            results.append({
-                'price_bin': price_bin,
-                'price_midpoint': price_bin.mid,
-                'win_rate': win_rate,
-                'ci_low': ci_low,
-                'ci_high': ci_high,
-                'n_trades': n,
-                'n_markets': bin_data['condition_id'].nunique()
-            })
-        
-        return pd.DataFrame(results)
-    
-    def _wilson_confidence_interval(self, 
-                                    successes: int, 
-                                    n: int, 
-                                    confidence: float = 0.95) -> Tuple[float, float]:
-        """
-        Calculate Wilson score confidence interval
-        More accurate than normal approximation for proportions
-        """
-        if n == 0:
-            return 0, 0
-        
-        z = stats.norm.ppf((1 + confidence) / 2)
-        p = successes / n
-        
-        denominator = 1 + z**2 / n
-        center = (p + z**2 / (2*n)) / denominator
-        margin = z * np.sqrt(p*(1-p)/n + z**2/(4*n**2)) / denominator
-        
-        return max(0, center - margin), min(1, center + margin)
+            # Trades and wins per bin in two C-level passes
+            n = np.bincount(codes, minlength=len(intervals))
+            wins = np.bincount(codes, weights=won[valid], minlength=len(intervals))
+        
+        # Distinct markets per bin: count unique (bin, market) pairs, using a
+        # hash-based unique rather than np.unique's sort
+        market_codes = self._market_codes[valid]
+        known = market_codes >= 0
+        pairs = pd.unique(codes[known] * self._n_market_ids + market_codes[known])
+        n_markets = np.bincount(pairs // max(self._n_market_ids, 1), minlength=len(intervals))
+        
+        keep = n > 0
+        n, wins, n_markets, intervals = n[keep], wins[keep], n_markets[keep], intervals[keep]
+        
+        # Calculate 95% confidence interval (Wilson score interval)
+        ci_low, ci_high = _wilson_confidence_interval(wins, n)
+        
+        results = pd.DataFrame({
+            'price_bin': intervals,
+            'price_midpoint': intervals.mid,
+            'win_rate': wins / n,
+            'ci_low': ci_low,
+            'ci_high': ci_high,
+            'n_trades': n,
+            'n_markets': n_markets
+        })
+        self._win_rate_cache[price_bins] = results
+        return results[results['n_trades'] >= min_samples].reset_index(drop=True)
     
     def plot_win_rate_vs_price(self, 
                                price_bins: int = 20,
@@ -116,24 +328,17 @@ class PolymarketAnalyzer:
             print("No data to plot!")
             return
         
-        fig, ax = plt.subplots(figsize=figsize)
+        # Imported here so analysis-only callers skip the matplotlib import
+        import matplotlib.pyplot as plt
         
-        # Plot win rate
-        ax.plot(results['price_midpoint'] * 100, 
-               results['win_rate'] * 100, 
-               'o-', color='#e31e24', linewidth=2.5, markersize=6,
-               label='Observed Win Rate', zorder=3)
+        fig, ax = plt.subplots(figsize=figsize)
         
-        # Plot confidence interval
-        ax.fill_between(results['price_midpoint'] * 100,
-                       results['ci_low'] * 100,
-                       results['ci_high'] * 100,
-                       alpha=0.3, color='#e31e24', label='95% Confidence Interval')
+        # Plot win rate and confidence interval
+        _plot_calibration(ax, results, '#e31e24', ci_label='95% Confidence Interval',
+                          linewidth=2.5, markersize=6, label='Observed Win Rate', zorder=3)
         
         # Plot perfect calibration line
-        x_perfect = np.linspace(0, 100, 100)
-        ax.plot(x_perfect, x_perfect, '--', color='#2ecc71', linewidth=2,
-               label='Perfect Calibration', zorder=2)
+        _plot_perfect_calibration(ax, linewidth=2, label='Perfect Calibration', zorder=2)
         
         # Styling
         ax.set_xlabel('Contract Price (¢)', fontsize=13, fontweight='bold')
@@ -161,6 +366,7 @@ class PolymarketAnalyzer:
             print(f"Plot saved to {save_path}")
         
         plt.show()
+        plt.close(fig)
         
         return results
     
@@ -175,9 +381,6 @@ class PolymarketAnalyzer:
         if time_buckets is None:
             time_buckets = [0, 24, 24*7, 24*30, 24*90, float('inf')]
         
-        # Filter out trades without time_to_resolution
-        df_with_time = self.df[self.df['time_to_resolution_hours'].notna()].copy()
-        
         # Create time buckets
         labels = []
         for i in range(len(time_buckets) - 1):
@@ -186,15 +389,21 @@ class PolymarketAnalyzer:
             else:
                 labels.append(f'{time_buckets[i]/24:.0f}-{time_buckets[i+1]/24:.0f}d')
         
-        df_with_time['time_bucket'] = pd.cut(
-            df_with_time['time_to_resolution_hours'],
+        # Trades without time_to_resolution fall in no bucket
+        time_bucket = pd.cut(
+            self.df['time_to_resolution_hours'],
             bins=time_buckets,
             labels=labels,
             include_lowest=True
         )
         
+        buckets = self._split(time_bucket.array, labels)
+        
         # Create subplots
         n_buckets = len(labels)
+        # Imported here so analysis-only callers skip the matplotlib import
+        import matplotlib.pyplot as plt
+        
         fig, axes = plt.subplots(2, 3, figsize=(18, 10))
         axes = axes.flatten()
         
@@ -202,7 +411,8 @@ class PolymarketAnalyzer:
             if idx >= len(axes):
                 break
             
-            bucket_data = df_with_time[df_with_time['time_bucket'] == time_label]
+            bucket = buckets[time_label]
+            bucket_data = bucket.df
             
             if len(bucket_data) < 100:
                 axes[idx].text(0.5, 0.5, f'Insufficient data\n(n={len(bucket_data)})',
@@ -211,31 +421,10 @@ class PolymarketAnalyzer:
                 continue
             
             # Calculate win rate by price for this time bucket
-            analyzer = PolymarketAnalyzer.__new__(PolymarketAnalyzer)
-            analyzer.df = bucket_data
-            results = analyzer.calculate_win_rate_by_price(price_bins=15, min_samples=20)
+            results = bucket.calculate_win_rate_by_price(price_bins=15, min_samples=20)
             
             # Plot
-            ax = axes[idx]
-            ax.plot(results['price_midpoint'] * 100, 
-                   results['win_rate'] * 100, 
-                   'o-', color='#e31e24', linewidth=2, markersize=5)
-            
-            ax.fill_between(results['price_midpoint'] * 100,
-                           results['ci_low'] * 100,
-                           results['ci_high'] * 100,
-                           alpha=0.3, color='#e31e24')
-            
-            # Perfect calibration
-            x_perfect = np.linspace(0, 100, 100)
-            ax.plot(x_perfect, x_perfect, '--', color='#2ecc71', linewidth=1.5, alpha=0.7)
-            
-            ax.set_xlim(0, 100)
-            ax.set_ylim(0, 100)
-            ax.grid(True, alpha=0.3)
-            ax.set_xlabel('Price (¢)', fontsize=10)
-            ax.set_ylabel('Win %', fontsize=10)
-            ax.set_title(f'{time_label} (n={len(bucket_data):,})', fontsize=11, fontweight='bold')
+            _plot_calibration_panel(axes[idx], results, f'{time_label} (n={len(bucket_data):,})')
         
         # Hide unused subplots
         for idx in range(len(labels), len(axes)):
@@ -245,6 +434,7 @@ class PolymarketAnalyzer:
                     fontsize=16, fontweight='bold', y=0.995)
         plt.tight_layout()
         plt.show()
+        plt.close(fig)
     
     def analyze_by_category(self, categories: Optional[list] = None):
         """
@@ -255,7 +445,13 @@ class PolymarketAnalyzer:
         """
         if categories is None:
             # Get top 6 categories by number of trades
-            categories = self.df['category'].value_counts().head(6).index.tolist()
+            category_counts = self.df['category'].value_counts()
+            categories = category_counts[category_counts > 0].head(6).index.tolist()
+        
+        category_analyzers = self._split(self.df['category'].array, categories[:6])
+        
+        # Imported here so analysis-only callers skip the matplotlib import
+        import matplotlib.pyplot as plt
         
         fig, axes = plt.subplots(2, 3, figsize=(18, 10))
         axes = axes.flatten()
@@ -264,7 +460,8 @@ class PolymarketAnalyzer:
             if idx >= len(axes):
                 break
             
-            category_data = self.df[self.df['category'] == category]
+            category_analyzer = category_analyzers[category]
+            category_data = category_analyzer.df
             
             if len(category_data) < 100:
                 axes[idx].text(0.5, 0.5, f'Insufficient data\n(n={len(category_data)})',
@@ -273,35 +470,16 @@ class PolymarketAnalyzer:
                 continue
             
             # Calculate win rate by price
-            analyzer = PolymarketAnalyzer.__new__(PolymarketAnalyzer)
-            analyzer.df = category_data
-            results = analyzer.calculate_win_rate_by_price(price_bins=15, min_samples=20)
+            results = category_analyzer.calculate_win_rate_by_price(price_bins=15, min_samples=20)
             
             # Plot
-            ax = axes[idx]
-            ax.plot(results['price_midpoint'] * 100, 
-                   results['win_rate'] * 100, 
-                   'o-', color='#e31e24', linewidth=2, markersize=5)
-            
-            ax.fill_between(results['price_midpoint'] * 100,
-                           results['ci_low'] * 100,
-                           results['ci_high'] * 100,
-                           alpha=0.3, color='#e31e24')
-            
-            x_perfect = np.linspace(0, 100, 100)
-            ax.plot(x_perfect, x_perfect, '--', color='#2ecc71', linewidth=1.5, alpha=0.7)
-            
-            ax.set_xlim(0, 100)
-            ax.set_ylim(0, 100)
-            ax.grid(True, alpha=0.3)
-            ax.set_xlabel('Price (¢)', fontsize=10)
-            ax.set_ylabel('Win %', fontsize=10)
-            ax.set_title(f'{category} (n={len(category_data):,})', fontsize=11, fontweight='bold')
+            _plot_calibration_panel(axes[idx], results, f'{category} (n={len(category_data):,})')
         
         plt.suptitle('Win Rate vs Price by Category', 
                     fontsize=16, fontweight='bold', y=0.995)
         plt.tight_layout()
         plt.show()
+        plt.close(fig)
     
     def analyze_yes_vs_no(self,
                          price_bins: int = 20,
@@ -321,8 +499,12 @@ class PolymarketAnalyzer:
             save_path: Path to save figure
         """
         # Separate YES and NO trades
-        yes_trades = self.df[self.df['outcome'] == 'Yes'].copy()
-        no_trades = self.df[self.df['outcome'] == 'No'].copy()
+        if self._price is None:
+            self._build_arrays()
+        yes_analyzer = self._subset(self._is_yes)
+        no_analyzer = self._subset((self.df['outcome'] == 'No').to_numpy())
+        yes_trades = yes_analyzer.df
+        no_trades = no_analyzer.df
         
         print(f"\nYES trades: {len(yes_trades):,}")
         print(f"NO trades: {len(no_trades):,}")
@@ -332,42 +514,23 @@ class PolymarketAnalyzer:
             return
         
         # Analyze each separately
-        yes_analyzer = PolymarketAnalyzer.__new__(PolymarketAnalyzer)
-        yes_analyzer.df = yes_trades
         yes_results = yes_analyzer.calculate_win_rate_by_price(price_bins, min_samples)
-        
-        no_analyzer = PolymarketAnalyzer.__new__(PolymarketAnalyzer)
-        no_analyzer.df = no_trades
         no_results = no_analyzer.calculate_win_rate_by_price(price_bins, min_samples)
         
         # Create plot
+        # Imported here so analysis-only callers skip the matplotlib import
+        import matplotlib.pyplot as plt
+        
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=figsize)
         
         # Left plot: Both on same graph
-        ax1.plot(yes_results['price_midpoint'] * 100, 
-                yes_results['win_rate'] * 100,
-                'o-', color='#3498db', linewidth=2.5, markersize=6,
-                label='YES contracts', zorder=3)
-        
-        ax1.fill_between(yes_results['price_midpoint'] * 100,
-                        yes_results['ci_low'] * 100,
-                        yes_results['ci_high'] * 100,
-                        alpha=0.2, color='#3498db')
-        
-        ax1.plot(no_results['price_midpoint'] * 100,
-                no_results['win_rate'] * 100,
-                'o-', color='#e74c3c', linewidth=2.5, markersize=6,
-                label='NO contracts', zorder=3)
-        
-        ax1.fill_between(no_results['price_midpoint'] * 100,
-                        no_results['ci_low'] * 100,
-                        no_results['ci_high'] * 100,
-                        alpha=0.2, color='#e74c3c')
+        _plot_calibration(ax1, yes_results, '#3498db', alpha=0.2,
+                          linewidth=2.5, markersize=6, label='YES contracts', zorder=3)
+        _plot_calibration(ax1, no_results, '#e74c3c', alpha=0.2,
+                          linewidth=2.5, markersize=6, label='NO contracts', zorder=3)
         
         # Perfect calibration line
-        x_perfect = np.linspace(0, 100, 100)
-        ax1.plot(x_perfect, x_perfect, '--', color='#2ecc71', linewidth=2,
-                label='Perfect Calibration', zorder=2)
+        _plot_perfect_calibration(ax1, linewidth=2, label='Perfect Calibration', zorder=2)
         
         ax1.set_xlabel('Contract Price (¢)', fontsize=12, fontweight='bold')
         ax1.set_ylabel('Win Percentage', fontsize=12, fontweight='bold')
@@ -410,6 +573,7 @@ class PolymarketAnalyzer:
             print(f"\nPlot saved to {save_path}")
         
         plt.show()
+        plt.close(fig)
         
         # Statistical summary
         print("\n" + "="*70)
@@ -486,7 +650,8 @@ def main():
     
     # Load most recent data file
     data_dir = Path("polymarket_data")
-    data_files = list(data_dir.glob("polymarket_trades_*.csv"))
+    data_files = (list(data_dir.glob("polymarket_trades_*.csv")) +
+                  list(data_dir.glob("polymarket_trades_*.parquet")))
     
     if not data_files:
         print("No data files found! Run polymarket_data_collector.py first.")
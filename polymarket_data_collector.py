@@ -5,13 +5,78 @@ Fetches most recent resolved markets ordered by volume.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from typing import List, Dict, Optional
-import json
+import hashlib
+import orjson
+from functools import lru_cache
 from pathlib import Path
 
+# Trades per /trades page (API max)
+BATCH_SIZE = 500
+
+# Markets per progress checkpoint
+CHECKPOINT_EVERY = 50
+
+# Column types of the processed trades, used for the Parquet progress files.
+# The string columns repeat a handful of values per market, so they are
+# dictionary-encoded and read back as pandas categoricals.
+_REPEATED_STRING = pa.dictionary(pa.int32(), pa.string())
+TRADES_SCHEMA = pa.schema([
+    ('condition_id', _REPEATED_STRING),
+    ('question', _REPEATED_STRING),
+    ('category', _REPEATED_STRING),
+    ('trade_timestamp', pa.timestamp('ns', tz='UTC')),
+    ('resolved_at', _REPEATED_STRING),
+    ('time_to_resolution_hours', pa.float64()),
+    ('price', pa.float64()),
+    ('size', pa.float64()),
+    ('side', _REPEATED_STRING),
+    ('outcome', _REPEATED_STRING),
+    ('won', pa.bool_()),
+    ('volume_total', pa.float64()),
+])
+
+
+@lru_cache(maxsize=4096)
+def _parse_iso(timestamp: str) -> datetime:
+    """
+    Parse an API ISO 8601 timestamp as an aware datetime (UTC if no offset).
+
+    Python 3.11+ fromisoformat parses the 'Z' and bare '+00' suffixes the
+    API uses directly; older versions reject them, so they are normalized
+    only when the direct parse fails. Cached, since the same market
+    timestamps are parsed repeatedly.
+    """
+    try:
+        parsed = datetime.fromisoformat(timestamp)
+    except ValueError:
+        timestamp = timestamp.replace('Z', '+00:00')
+        if timestamp.endswith('+00'):
+            timestamp = timestamp + ':00'
+        parsed = datetime.fromisoformat(timestamp)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _price_to_float(price) -> float:
+    """Outcome price as a float (0 if it can't be parsed)."""
+    try:
+        return float(price)
+    except (ValueError, TypeError):
+        return 0
+
 
 class PolymarketDataCollector:
     """
@@ -19,34 +84,231 @@ class PolymarketDataCollector:
     Fetches most recent resolved markets ordered by volume.
     """
 
-    def __init__(self, output_dir: str = "polymarket_data"):
+    def __init__(self, output_dir: str = "polymarket_data", cache_responses: bool = False,
+                 verbose: bool = True):
+        """
+        Args:
+            output_dir: Directory for collected data
+            cache_responses: Cache full trade pages on disk (in output_dir/.http_cache)
+                             so repeated runs don't re-download them
+            verbose: Print a status line for every market; when False only
+                     periodic progress and the summary are printed
+        """
+        self.verbose = verbose
         self.gamma_url = "https://gamma-api.polymarket.com"
         self.data_api_url = "https://data-api.polymarket.com"
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
 
-        # Rate limiting
-        self.last_request_time = 0
-        self.min_request_interval = 0.1  # 100ms between requests
+        self.cache_dir = self.output_dir / '.http_cache' if cache_responses else None
+        if self.cache_dir:
+            self.cache_dir.mkdir(exist_ok=True)
+
+        # One pooled, keep-alive session for all requests so each call reuses an
+        # open connection instead of a fresh TCP+TLS handshake. Transient errors
+        # (rate limiting, 5xx) are retried with backoff.
+        retry = Retry(total=3, backoff_factor=0.3,
+                      status_forcelist=[429, 500, 502, 503, 504],
+                      allowed_methods=['GET'])
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=retry)
+        self._session = requests.Session()
+        self._session.mount('https://', adapter)
+
+        # Rate limiting: token bucket allowing short bursts of concurrent
+        # requests while averaging at most requests_per_second
+        self.requests_per_second = 10
+        self.max_burst = 10
+        self._tokens = self.max_burst
+        self._token_time = time.monotonic()
+        self._rate_lock = threading.Lock()
+
+        # Max pages of one paginated listing requested concurrently
+        self.max_concurrent_pages = 8
+        # Max markets whose trades are fetched concurrently
+        self.max_concurrent_markets = 8
+
+    def close(self):
+        """Close the HTTP session and its pooled connections."""
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def _rate_limit(self):
-        """Simple rate limiting to avoid hitting API limits."""
-        elapsed = time.time() - self.last_request_time
-        if elapsed < self.min_request_interval:
-            time.sleep(self.min_request_interval - elapsed)
-        self.last_request_time = time.time()
-
-    def _make_request(self, url: str, params: Optional[Dict] = None) -> Optional[Dict]:
-        """Make a GET request with error handling."""
+        """
+        Token-bucket rate limiting to avoid hitting API limits (shared across threads).
+
+        Each request takes a token; tokens refill at requests_per_second up to
+        max_burst. When the bucket is empty the request reserves the next
+        token and sleeps until it is due, outside the lock so other threads
+        can reserve theirs meanwhile.
+        """
+        with self._rate_lock:
+            now = time.monotonic()
+            self._tokens = min(self.max_burst,
+                               self._tokens + (now - self._token_time) * self.requests_per_second)
+            self._token_time = now
+            self._tokens -= 1
+            wait = -self._tokens / self.requests_per_second if self._tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+    def _make_request(self, url: str, params: Optional[Dict] = None,
+                      cache_min_items: Optional[int] = None) -> Optional[Dict]:
+        """
+        Make a GET request with error handling.
+
+        Args:
+            url: Request URL
+            params: Query parameters
+            cache_min_items: If set and the response cache is enabled, serve the
+                             request from the cache when possible, and cache list
+                             responses with at least this many items (e.g. full
+                             trade pages of a resolved market, which don't change)
+        """
+        cache_path = None
+        if cache_min_items is not None and self.cache_dir is not None:
+            key = hashlib.blake2b(url.encode() + orjson.dumps(params or {}, option=orjson.OPT_SORT_KEYS),
+                                  digest_size=16).hexdigest()
+            cache_path = self.cache_dir / f'{key}.json'
+            if cache_path.exists():
+                return orjson.loads(cache_path.read_bytes())
+
         self._rate_limit()
         try:
-            response = requests.get(url, params=params, timeout=30)
+            response = self._session.get(url, params=params, timeout=30)
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            # orjson decodes the large list pages much faster than stdlib json
+            data = orjson.loads(response.content)
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
             print(f"Error fetching {url}: {e}")
             return None
 
+        if cache_path is not None and isinstance(data, list) and len(data) >= cache_min_items:
+            # Write then rename so a concurrent reader never sees a partial file
+            tmp_path = cache_path.with_name(f'{cache_path.name}.{threading.get_ident()}.tmp')
+            tmp_path.write_bytes(orjson.dumps(data))
+            tmp_path.replace(cache_path)
+
+        return data
+
+    def _iter_pages(self, fetch_page, page_size: int, max_items: Optional[int] = None,
+                    first_window: int = 1, max_window: Optional[int] = None):
+        """
+        Yield the pages of an offset-paginated listing in order.
+
+        Pages are requested concurrently in windows that start at first_window
+        pages and double up to max_window. Once the last page of a window
+        turns out full, the next window is requested before that page is
+        yielded, so the caller's work on it overlaps the next round trip.
+        Iteration stops after the first empty or short page, and requests
+        not yet started are cancelled; callers may stop early by breaking out.
+
+        Pages of a window past the end of the listing are wasted requests, so
+        callers that already run several listings concurrently should page
+        one at a time (max_window=1).
+
+        Args:
+            fetch_page: Function taking an offset and returning that page (or None)
+            page_size: Number of items per full page
+            max_items: Never request pages beyond this many items (None for all)
+            first_window: Number of pages to request in the first window
+            max_window: Most pages requested at once (default: max_concurrent_pages)
+        """
+        max_window = max_window or self.max_concurrent_pages
+        next_offset = 0
+
+        def submit_window(pool: ThreadPoolExecutor, window: int) -> list:
+            nonlocal next_offset
+            if max_items:
+                window = min(window, -(-(max_items - next_offset) // page_size))
+            futures = [pool.submit(fetch_page, next_offset + k * page_size)
+                       for k in range(max(window, 0))]
+            next_offset += len(futures) * page_size
+            return futures
+
+        window = max(1, min(first_window, max_window))
+        pool = ThreadPoolExecutor(max_workers=max_window)
+        try:
+            futures = submit_window(pool, window)
+            while futures:
+                next_futures = []
+                for k, future in enumerate(futures):
+                    page = future.result()
+                    if not page:
+                        return
+                    if k == len(futures) - 1 and len(page) == page_size:
+                        window = min(window * 2, max_window)
+                        next_futures = submit_window(pool, window)
+                    yield page
+                    if len(page) < page_size:
+                        return
+                futures = next_futures
+        finally:
+            # Don't send queued requests for pages past the end
+            pool.shutdown(cancel_futures=True)
+
+    def _iter_market_trades(self, markets: List[Dict], fetch_trades):
+        """
+        Yield (processed_market, n_raw_trades, was_truncated, market_df) for
+        each market in order.
+
+        Markets are processed as they are queued, and only those with valid
+        resolution data and nonzero volume have their trades fetched, in a
+        thread pool up to max_concurrent_markets ahead of the market being
+        yielded. The caller's loop runs in market order while the requests
+        overlap, and skipped markets never take a read-ahead slot. Each
+        worker converts its raw trade dicts with _process_trades and drops
+        them, so read-ahead markets are held as compact DataFrames.
+        processed_market is None for markets without valid resolution data,
+        and market_df is None for markets without trades (including those
+        reporting zero volume, which are never requested).
+
+        Args:
+            markets: List of market dictionaries from Gamma API
+            fetch_trades: Function taking a condition_id and returning
+                          (list of trades, was_truncated)
+        """
+        def fetch(processed_market: Dict):
+            trades, was_truncated = fetch_trades(processed_market['condition_id'])
+            if not trades:
+                return processed_market, 0, was_truncated, None
+            return (processed_market, len(trades), was_truncated,
+                    self._process_trades(trades, processed_market))
+
+        if not markets:
+            return
+
+        # Pending entries are futures, or the result itself for a market
+        # that is skipped without a request
+        with ThreadPoolExecutor(max_workers=self.max_concurrent_markets) as pool:
+            pending = deque()
+            n_in_flight = 0
+            for market in markets:
+                processed_market = self.process_market_for_analysis(market)
+                if not processed_market:
+                    pending.append((None, 0, False, None))
+                    continue
+                if market.get('volumeNum') == 0:
+                    # An explicit zero volume means it never traded
+                    pending.append((processed_market, 0, False, None))
+                    continue
+                pending.append(pool.submit(fetch, processed_market))
+                n_in_flight += 1
+                while n_in_flight > self.max_concurrent_markets:
+                    entry = pending.popleft()
+                    if isinstance(entry, tuple):
+                        yield entry
+                    else:
+                        n_in_flight -= 1
+                        yield entry.result()
+            while pending:
+                entry = pending.popleft()
+                yield entry if isinstance(entry, tuple) else entry.result()
+
     def _parse_market_times(self, processed_market: Dict) -> tuple[Optional[datetime], Optional[datetime]]:
         """Parse start and end times from processed market data."""
         start_time = None
@@ -57,20 +319,9 @@ class PolymarketDataCollector:
             end_str = processed_market.get('resolved_at')
 
             if start_str:
-                start_str = start_str.replace('Z', '+00:00')
-                if start_str.endswith('+00'):
-                    start_str = start_str + ':00'
-                start_time = datetime.fromisoformat(start_str)
-                if start_time.tzinfo is None:
-                    start_time = start_time.replace(tzinfo=timezone.utc)
-
+                start_time = _parse_iso(start_str)
             if end_str:
-                end_str = end_str.replace('Z', '+00:00')
-                if end_str.endswith('+00'):
-                    end_str = end_str + ':00'
-                end_time = datetime.fromisoformat(end_str)
-                if end_time.tzinfo is None:
-                    end_time = end_time.replace(tzinfo=timezone.utc)
+                end_time = _parse_iso(end_str)
         except Exception:
             pass
 
@@ -125,22 +376,18 @@ class PolymarketDataCollector:
             List of all market dictionaries
         """
         all_markets = []
-        offset = 0
         limit = 100
 
         print(f"Fetching {'closed' if closed else 'open'} markets...")
 
-        while True:
-            markets = self.get_markets(
-                closed=closed,
-                limit=limit,
-                offset=offset,
-                **filters
-            )
+        def fetch_page(offset: int) -> List[Dict]:
+            return self.get_markets(closed=closed, limit=limit, offset=offset, **filters)
 
-            if not markets:
-                break
+        # With a known target, request every page it needs at once
+        first_window = -(-max_markets // limit) if max_markets else 1
 
+        for markets in self._iter_pages(fetch_page, limit, max_items=max_markets,
+                                        first_window=first_window):
             all_markets.extend(markets)
             print(f"Fetched {len(all_markets)} markets so far...")
 
@@ -148,12 +395,6 @@ class PolymarketDataCollector:
                 all_markets = all_markets[:max_markets]
                 break
 
-            if len(markets) < limit:
-                break
-
-            offset += limit
-            time.sleep(0.5)
-
         print(f"Total markets fetched: {len(all_markets)}")
         return all_markets
 
@@ -161,6 +402,11 @@ class PolymarketDataCollector:
         """
         Fetch trades for a specific market.
 
+        Pages are requested one at a time, each requested before the previous
+        one is processed (see _iter_pages). Markets are already fetched
+        concurrently, so speculative pages past a market's end would only use
+        up the shared rate limit.
+
         Args:
             condition_id: Market's conditionId
             max_trades: Maximum trades to fetch (None for unlimited)
@@ -169,19 +415,15 @@ class PolymarketDataCollector:
             Tuple of (list of trades, was_truncated)
         """
         all_trades = []
-        offset = 0
         truncated = False
-        batch_size = 500  # API max
-
-        while True:
-            params = {'market': condition_id, 'limit': batch_size, 'offset': offset}
+        url = f"{self.data_api_url}/trades"
 
-            url = f"{self.data_api_url}/trades"
-            trades = self._make_request(url, params)
-
-            if not trades:
-                break
+        def fetch_page(offset: int) -> Optional[List[Dict]]:
+            params = {'market': condition_id, 'limit': BATCH_SIZE, 'offset': offset}
+            return self._make_request(url, params, cache_min_items=BATCH_SIZE)
 
+        # Pacing between pages is left to the rate limiter
+        for trades in self._iter_pages(fetch_page, BATCH_SIZE, max_items=max_trades, max_window=1):
             all_trades.extend(trades)
 
             if max_trades and len(all_trades) >= max_trades:
@@ -189,12 +431,6 @@ class PolymarketDataCollector:
                 truncated = True
                 break
 
-            if len(trades) < batch_size:
-                break
-
-            offset += batch_size
-            time.sleep(0.2)
-
         return all_trades, truncated
 
     def process_market_for_analysis(self, market: Dict) -> Optional[Dict]:
@@ -207,33 +443,45 @@ class PolymarketDataCollector:
         Returns:
             Processed market dictionary with key fields
         """
-        if not market.get('closed', False):
+        # Cheap checks first, before any JSON parsing: the market must be
+        # closed and identifiable
+        if not market.get('closed', False) or not market.get('conditionId'):
+            return None
+
+        raw_outcomes = market.get('outcomes')
+        raw_prices = market.get('outcomePrices')
+        if raw_outcomes in (None, '', '[]') or raw_prices in (None, '', '[]'):
             return None
 
         try:
-            outcomes = json.loads(market.get('outcomes', '[]'))
-            outcome_prices = json.loads(market.get('outcomePrices', '[]'))
-        except (json.JSONDecodeError, TypeError):
+            outcomes = orjson.loads(raw_outcomes)
+            outcome_prices = orjson.loads(raw_prices)
+        except orjson.JSONDecodeError:
             return None
 
         if not outcomes or not outcome_prices:
             return None
 
-        winning_outcome = None
-        tokens = {}
-        for i, (outcome, price) in enumerate(zip(outcomes, outcome_prices)):
-            try:
-                price_float = float(price)
-            except (ValueError, TypeError):
-                price_float = 0
-
-            is_winner = price_float > 0.99
-            tokens[outcome] = {
-                'index': i,
-                'winner': is_winner,
+        if outcomes == ['Yes', 'No'] and len(outcome_prices) == 2:
+            # Fast path for the common binary market
+            yes_won = _price_to_float(outcome_prices[0]) > 0.99
+            no_won = _price_to_float(outcome_prices[1]) > 0.99
+            tokens = {
+                'Yes': {'index': 0, 'winner': yes_won},
+                'No': {'index': 1, 'winner': no_won},
             }
-            if is_winner:
-                winning_outcome = outcome
+            winning_outcome = 'No' if no_won else ('Yes' if yes_won else None)
+        else:
+            winning_outcome = None
+            tokens = {}
+            for i, (outcome, price) in enumerate(zip(outcomes, outcome_prices)):
+                is_winner = _price_to_float(price) > 0.99
+                tokens[outcome] = {
+                    'index': i,
+                    'winner': is_winner,
+                }
+                if is_winner:
+                    winning_outcome = outcome
 
         if winning_outcome is None:
             return None
@@ -245,7 +493,7 @@ class PolymarketDataCollector:
                 category = events[0].get('category') or ''
         category = str(category) if category else ''
 
-        return {
+        processed = {
             'condition_id': market.get('conditionId'),
             'question': market.get('question'),
             'category': category,
@@ -255,47 +503,86 @@ class PolymarketDataCollector:
             'winning_outcome': winning_outcome,
             'volume': market.get('volumeNum', 0),
             'liquidity': market.get('liquidityNum', 0),
-            'tokens': tokens
+            'tokens': tokens,
         }
 
-    def _process_trades(self, trades: List[Dict], processed_market: Dict) -> List[Dict]:
-        """Convert raw trades to analysis-ready format."""
-        condition_id = processed_market['condition_id']
-        _, resolved_time = self._parse_market_times(processed_market)
-
-        trade_data = []
-        for trade in trades:
-            outcome = trade.get('outcome')
-            if not outcome:
-                continue
+        # Resolved at parsed and the winner lookup flattened once per market,
+        # rather than per batch of trades
+        _, processed['resolved_time'] = self._parse_market_times(processed)
+        processed['winner_by_outcome'] = {outcome: token['winner'] for outcome, token in tokens.items()}
+        return processed
+
+    def _process_trades(self, trades: List[Dict], processed_market: Dict) -> pd.DataFrame:
+        """Convert a market's raw trades to an analysis-ready DataFrame."""
+        resolved_time = processed_market['resolved_time']
+
+        raw = pd.DataFrame(trades, columns=['timestamp', 'price', 'size', 'side', 'outcome'])
+        raw = raw[raw['outcome'].notna() & raw['outcome'].ne('')]
+
+        # Vectorized over the whole market: epoch seconds -> UTC timestamps,
+        # with a missing or zero timestamp left as NaT
+        timestamp = pd.to_numeric(raw['timestamp'])
+        trade_time = pd.to_datetime(timestamp.where(timestamp != 0), unit='s', utc=True)
+
+        time_to_resolution = pd.Series(float('nan'), index=raw.index)
+        if resolved_time:
+            time_to_resolution = (pd.Timestamp(resolved_time) - trade_time).dt.total_seconds()
+            # A trade exactly at resolution has no time to resolution
+            time_to_resolution = time_to_resolution.where(time_to_resolution != 0)
+
+        won = raw['outcome'].map(processed_market['winner_by_outcome']).fillna(False).astype(bool)
+
+        return pd.DataFrame({
+            'condition_id': processed_market['condition_id'],
+            'question': processed_market['question'],
+            'category': processed_market['category'],
+            'trade_timestamp': trade_time,
+            'resolved_at': processed_market['resolved_at'],
+            'time_to_resolution_hours': time_to_resolution / 3600,
+            'price': raw['price'],
+            'size': raw['size'],
+            'side': raw['side'],
+            'outcome': raw['outcome'],
+            'won': won,
+            'volume_total': processed_market['volume'],
+        }).reset_index(drop=True)
+
+    def _start_progress(self):
+        """
+        Start a run's progress checkpoints in output_dir/trades_progress/,
+        removing the parts of any previous run.
 
-            trade_timestamp = trade.get('timestamp')
-            time_to_resolution = None
-            trade_time = None
-
-            if trade_timestamp:
-                trade_time = datetime.fromtimestamp(trade_timestamp, tz=timezone.utc)
-                if resolved_time:
-                    time_to_resolution = (resolved_time - trade_time).total_seconds()
-
-            won = processed_market['tokens'].get(outcome, {}).get('winner', False)
-
-            trade_data.append({
-                'condition_id': condition_id,
-                'question': processed_market['question'],
-                'category': processed_market['category'],
-                'trade_timestamp': trade_time,
-                'resolved_at': processed_market['resolved_at'],
-                'time_to_resolution_hours': time_to_resolution / 3600 if time_to_resolution else None,
-                'price': trade.get('price'),
-                'size': trade.get('size'),
-                'side': trade.get('side'),
-                'outcome': outcome,
-                'won': won,
-                'volume_total': processed_market['volume'],
-            })
-
-        return trade_data
+        Each checkpoint is written as its own closed Parquet file, so every
+        finished checkpoint can be read (e.g. pd.read_parquet on the
+        directory) even if the run is killed, and a checkpoint costs only
+        its new rows rather than a rewrite of everything collected so far.
+        """
+        self._progress_dir = self.output_dir / 'trades_progress'
+        self._progress_dir.mkdir(exist_ok=True)
+        for part in self._progress_dir.glob('part-*.parquet'):
+            part.unlink()
+        self._n_progress_parts = 0
+
+    def _save_progress(self, market_dfs: List[pd.DataFrame]):
+        """Write the trades of the markets since the last checkpoint as the next part."""
+        if not market_dfs:
+            return
+        table = pa.Table.from_pandas(pd.concat(market_dfs, ignore_index=True),
+                                     schema=TRADES_SCHEMA, preserve_index=False)
+        part = self._progress_dir / f'part-{self._n_progress_parts:05d}.parquet'
+        # Write then rename so a crash mid-write never leaves a corrupt part;
+        # the dot prefix hides the temporary file from directory reads
+        tmp_path = part.with_name(f'.{part.name}.tmp')
+        pq.write_table(table, tmp_path, compression='zstd')
+        tmp_path.replace(part)
+        self._n_progress_parts += 1
+
+    def _read_progress(self) -> pd.DataFrame:
+        """Read back all of this run's progress checkpoints, in order."""
+        parts = sorted(self._progress_dir.glob('part-*.parquet'))
+        if not parts:
+            return TRADES_SCHEMA.empty_table().to_pandas()
+        return pq.read_table(parts, schema=TRADES_SCHEMA).to_pandas()
 
     def _print_summary(self, df: pd.DataFrame, markets_processed: int,
                        markets_with_trades: int, markets_skipped_no_resolution: int,
@@ -311,13 +598,24 @@ class PolymarketDataCollector:
         print(f"Saved to: {output_file}")
 
         if len(df) > 0:
-            trades_per_market = df.groupby('condition_id').size()
-            print(f"\nTrades per market distribution:")
-            print(f"  Min: {trades_per_market.min()}, Max: {trades_per_market.max()}, Median: {trades_per_market.median():.0f}")
-            print(f"  Markets with <10 trades:  {(trades_per_market < 10).sum()}")
-            print(f"  Markets with <50 trades:  {(trades_per_market < 50).sum()}")
-            print(f"  Markets with <100 trades: {(trades_per_market < 100).sum()}")
-            print(f"  Markets with 100+ trades: {(trades_per_market >= 100).sum()}")
+            # Trades per market from one bincount over the market codes; the
+            # sorted counts then give every threshold with a binary search
+            market_ids = df['condition_id']
+            if isinstance(market_ids.dtype, pd.CategoricalDtype):
+                codes = market_ids.cat.codes.to_numpy()
+            else:
+                codes, _ = pd.factorize(market_ids)
+            trades_per_market = np.bincount(codes[codes >= 0])
+            trades_per_market = np.sort(trades_per_market[trades_per_market > 0])
+            lt10, lt50, lt100 = np.searchsorted(trades_per_market, [10, 50, 100])
+
+            if len(trades_per_market) > 0:
+                print(f"\nTrades per market distribution:")
+                print(f"  Min: {trades_per_market[0]}, Max: {trades_per_market[-1]}, Median: {np.median(trades_per_market):.0f}")
+                print(f"  Markets with <10 trades:  {lt10}")
+                print(f"  Markets with <50 trades:  {lt50}")
+                print(f"  Markets with <100 trades: {lt100}")
+                print(f"  Markets with 100+ trades: {len(trades_per_market) - lt100}")
 
         print(f"{'='*60}")
 
@@ -351,47 +649,59 @@ class PolymarketDataCollector:
         markets = self.get_all_markets(closed=True, max_markets=num_markets, **filters)
 
         if save_raw:
-            with open(self.output_dir / 'raw_markets.json', 'w') as f:
-                json.dump(markets, f, indent=2)
-
-        # Process markets and collect trades
-        all_trade_data = []
+            # Compact, unindented orjson: much faster to write and about half
+            # the size of indented stdlib json
+            (self.output_dir / 'raw_markets.json').write_bytes(orjson.dumps(markets))
+
+        # Process markets and collect trades. Trades are buffered only until
+        # the next checkpoint, and the final dataset is read back from the
+        # checkpoints once at the end.
+        n_trades = 0
         markets_with_trades = 0
         markets_skipped_no_resolution = 0
         markets_skipped_no_trades = 0
 
-        for i, market in enumerate(markets):
-            question = market.get('question', 'Unknown')[:60]
-            print(f"\nProcessing market {i+1}/{len(markets)}: {question}...")
+        def fetch_trades(condition_id: str):
+            return self.get_trades_for_market(condition_id, max_trades_per_market)
+
+        market_trades = self._iter_market_trades(markets, fetch_trades)
+        self._start_progress()
+        batch = []  # trades of the markets since the last checkpoint
+        for i, (processed_market, n_raw_trades, was_truncated, market_df) in enumerate(market_trades):
+            if self.verbose:
+                question = markets[i].get('question', 'Unknown')[:60]
+                print(f"\nProcessing market {i+1}/{len(markets)}: {question}...")
 
-            processed_market = self.process_market_for_analysis(market)
             if not processed_market:
                 markets_skipped_no_resolution += 1
-                print(f"  Skipped: No valid resolution data")
+                if self.verbose:
+                    print(f"  Skipped: No valid resolution data")
                 continue
 
-            trades, was_truncated = self.get_trades_for_market(
-                processed_market['condition_id'], max_trades_per_market
-            )
-
-            if not trades:
+            if market_df is None:
                 markets_skipped_no_trades += 1
-                print(f"  Skipped: No trades found")
+                if self.verbose:
+                    print(f"  Skipped: No trades found")
                 continue
 
-            truncation_note = f" (capped at {max_trades_per_market})" if was_truncated else ""
-            print(f"  Found {len(trades)} trades{truncation_note}")
+            if self.verbose:
+                truncation_note = f" (capped at {max_trades_per_market})" if was_truncated else ""
+                print(f"  Found {n_raw_trades} trades{truncation_note}")
             markets_with_trades += 1
 
-            all_trade_data.extend(self._process_trades(trades, processed_market))
+            if len(market_df) > 0:
+                n_trades += len(market_df)
+                batch.append(market_df)
+            del market_df
 
-            if (i + 1) % 50 == 0:
-                temp_df = pd.DataFrame(all_trade_data)
-                temp_df.to_csv(self.output_dir / f'trades_progress_{i+1}.csv', index=False)
-                print(f"\n  Progress saved: {len(all_trade_data)} trades from {markets_with_trades} markets")
+            if (i + 1) % CHECKPOINT_EVERY == 0:
+                self._save_progress(batch)
+                batch = []
+                print(f"\n  Progress saved: {n_trades} trades from {markets_with_trades} markets")
+        self._save_progress(batch)
 
         # Save final dataset
-        df = pd.DataFrame(all_trade_data)
+        df = self._read_progress()
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         output_file = self.output_dir / f'polymarket_trades_{timestamp}.csv'
         df.to_csv(output_file, index=False)
@@ -404,14 +714,13 @@ class PolymarketDataCollector:
 
 def main():
     """Example usage"""
-    collector = PolymarketDataCollector(output_dir="polymarket_data")
-
-    df = collector.collect_dataset(
-        num_markets=500,
-        max_trades_per_market=10000,
-        category=None,
-        save_raw=True
-    )
+    with PolymarketDataCollector(output_dir="polymarket_data") as collector:
+        df = collector.collect_dataset(
+            num_markets=500,
+            max_trades_per_market=10000,
+            category=None,
+            save_raw=True
+        )
 
     if len(df) > 0:
         print("\nDataset Summary:")
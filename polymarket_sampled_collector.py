@@ -4,13 +4,14 @@ Extends the base collector with time-window sampling for better coverage.
 Collects markets across multiple weeks and samples trades from large markets.
 """
 
-import time
 from datetime import datetime, timezone, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from typing import List, Dict, Optional
-import json
+import orjson
 import pandas as pd
 
-from polymarket_data_collector import PolymarketDataCollector
+from polymarket_data_collector import BATCH_SIZE, CHECKPOINT_EVERY, PolymarketDataCollector
 
 
 class PolymarketSampledCollector(PolymarketDataCollector):
@@ -42,13 +43,12 @@ class PolymarketSampledCollector(PolymarketDataCollector):
         import random
 
         url = f"{self.data_api_url}/trades"
-        batch_size = 500  # API max
         offset = 0
 
         # Phase 1: Fetch up to 2000 trades to assess market size
         all_trades = []
         while len(all_trades) < 2000:
-            params = {'market': condition_id, 'limit': batch_size, 'offset': offset}
+            params = {'market': condition_id, 'limit': BATCH_SIZE, 'offset': offset}
             batch = self._make_request(url, params)
 
             if not batch:
@@ -56,12 +56,11 @@ class PolymarketSampledCollector(PolymarketDataCollector):
 
             all_trades.extend(batch)
 
-            if len(batch) < batch_size:
+            if len(batch) < BATCH_SIZE:
                 # We've fetched all trades, no sampling needed
                 return all_trades[:max_trades], False
 
-            offset += batch_size
-            time.sleep(0.1)
+            offset += BATCH_SIZE
 
         if len(all_trades) < 2000:
             return all_trades[:max_trades], False
@@ -71,7 +70,7 @@ class PolymarketSampledCollector(PolymarketDataCollector):
         max_fetch = max(max_trades * 2, 10000)  # Fetch enough to sample from
 
         while len(all_trades) < max_fetch:
-            params = {'market': condition_id, 'limit': batch_size, 'offset': offset}
+            params = {'market': condition_id, 'limit': BATCH_SIZE, 'offset': offset}
             batch = self._make_request(url, params)
 
             if not batch:
@@ -79,49 +78,51 @@ class PolymarketSampledCollector(PolymarketDataCollector):
 
             all_trades.extend(batch)
 
-            if len(batch) < batch_size:
+            if len(batch) < BATCH_SIZE:
                 break
 
-            offset += batch_size
-            time.sleep(0.1)
+            offset += BATCH_SIZE
 
         # If we have fewer trades than max_trades, return all
         if len(all_trades) <= max_trades:
             return all_trades, False
 
         # Phase 3: Sample to get good time coverage
-        # Keep newest 2000, sample evenly from the rest
-        newest_trades = all_trades[:2000]
-        older_trades = all_trades[2000:]
+        # Keep newest 2000, sample evenly from the rest. Windows are index
+        # ranges into all_trades, so the older trades are never copied out.
+        n_newest = 2000
+        n_older = len(all_trades) - n_newest
 
-        remaining_budget = max_trades - len(newest_trades)
+        remaining_budget = max_trades - n_newest
         if remaining_budget <= 0:
-            return newest_trades[:max_trades], True
+            return all_trades[:max_trades], True
 
-        if len(older_trades) <= remaining_budget:
+        if n_older <= remaining_budget:
             # Can keep all older trades
-            sampled = newest_trades + older_trades
+            sampled = all_trades
         else:
             # Sample evenly across time windows from older trades
             older_windows = min(num_windows, 5)
-            window_size = len(older_trades) // older_windows
+            window_size = n_older // older_windows
             samples_per_window = remaining_budget // older_windows
 
-            sampled_older = []
+            sampled = all_trades[:n_newest]
             for i in range(older_windows):
-                window_start = i * window_size
-                window_end = (i + 1) * window_size if i < older_windows - 1 else len(older_trades)
-                window_trades = older_trades[window_start:window_end]
+                window_start = n_newest + i * window_size
+                window_end = n_newest + (i + 1) * window_size if i < older_windows - 1 else len(all_trades)
 
-                if len(window_trades) <= samples_per_window:
-                    sampled_older.extend(window_trades)
+                if window_end - window_start <= samples_per_window:
+                    sampled.extend(all_trades[window_start:window_end])
                 else:
-                    sampled_older.extend(random.sample(window_trades, samples_per_window))
-
-            sampled = newest_trades + sampled_older
-
-        # Sort by timestamp and return
-        sampled.sort(key=lambda x: x['timestamp'], reverse=True)
+                    # Sample positions and keep them in API order, so each
+                    # window stays a sorted run
+                    picks = sorted(random.sample(range(window_start, window_end), samples_per_window))
+                    sampled.extend(all_trades[j] for j in picks)
+            del all_trades
+
+        # Sort by timestamp and return. The list is made of runs already in
+        # API order, which the sort merges in close to linear time.
+        sampled.sort(key=itemgetter('timestamp'), reverse=True)
         return sampled[:max_trades], True
 
     def _fetch_markets_for_window(self,
@@ -166,7 +167,6 @@ class PolymarketSampledCollector(PolymarketDataCollector):
                 break
 
             offset += batch_size
-            time.sleep(0.1)
 
         return markets
 
@@ -184,86 +184,106 @@ class PolymarketSampledCollector(PolymarketDataCollector):
             List of unique market dictionaries (deduplicated by condition_id)
         """
         now = datetime.now(timezone.utc)
-        all_markets = []
-        seen_condition_ids = set()
-
-        for week in range(weeks_back):
-            end_date = now - timedelta(weeks=week)
-            start_date = end_date - timedelta(weeks=1)
-
-            start_str = start_date.strftime('%Y-%m-%d')
-            end_str = end_date.strftime('%Y-%m-%d')
-
-            print(f"\nFetching markets from {start_str} to {end_str}...")
-
-            markets = self._fetch_markets_for_window(start_str, end_str, markets_per_window)
-
-            # Deduplicate by condition_id
-            new_markets = 0
-            for market in markets:
-                cid = market.get('conditionId') or market.get('condition_id')
-                if cid and cid not in seen_condition_ids:
-                    seen_condition_ids.add(cid)
-                    all_markets.append(market)
-                    new_markets += 1
-
-            print(f"  Found {len(markets)} markets ({new_markets} new, {len(markets) - new_markets} duplicates)")
-
-        return all_markets
+        # conditionId -> first market seen with it (dicts keep insertion order)
+        all_markets = {}
+
+        # (start, end) date strings for each week, most recent first; each
+        # window's start is the next window's end
+        days = [(now - timedelta(weeks=week)).date().isoformat() for week in range(weeks_back + 1)]
+        windows = list(zip(days[1:], days[:-1]))
+
+        # Each window is an independent query, so windows are paginated
+        # concurrently; map returns them in order, so the most recent week
+        # still wins when a market appears in several windows
+        def fetch_window(window: tuple) -> List[Dict]:
+            start_str, end_str = window
+            return self._fetch_markets_for_window(start_str, end_str, markets_per_window)
+
+        print(f"\nFetching markets for {len(windows)} weekly windows...")
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_concurrent_pages, weeks_back))) as pool:
+            window_markets = pool.map(fetch_window, windows)
+            for (start_str, end_str), markets in zip(windows, window_markets):
+                print(f"\nFetched markets from {start_str} to {end_str}")
+
+                # Deduplicate by condition_id
+                n_before = len(all_markets)
+                for market in markets:
+                    cid = market.get('conditionId') or market.get('condition_id')
+                    if cid:
+                        all_markets.setdefault(cid, market)
+                new_markets = len(all_markets) - n_before
+
+                print(f"  Found {len(markets)} markets ({new_markets} new, {len(markets) - new_markets} duplicates)")
+
+        return list(all_markets.values())
 
     def _collect_trades_for_markets(self,
                                     markets: List[Dict],
-                                    max_trades_per_market: int,
-                                    save_progress: bool = True) -> tuple[List[Dict], dict]:
+                                    max_trades_per_market: int) -> tuple[int, dict]:
         """
-        Collect trades for a list of markets.
+        Collect trades for a list of markets into the progress checkpoints
+        (see _start_progress).
+
+        Trades are only held in memory until the next checkpoint, every
+        CHECKPOINT_EVERY markets.
 
         Args:
             markets: List of market dictionaries
             max_trades_per_market: Maximum trades to fetch per market
-            save_progress: Whether to save progress checkpoints
 
         Returns:
-            Tuple of (list of trade data dicts, stats dict)
+            Tuple of (number of trades written, stats dict)
         """
-        all_trade_data = []
+        n_trades = 0
         stats = {
             'markets_with_trades': 0,
             'markets_skipped_no_resolution': 0,
             'markets_skipped_no_trades': 0,
         }
 
-        for i, market in enumerate(markets):
-            question = market.get('question', 'Unknown')[:60]
-            print(f"\nProcessing market {i+1}/{len(markets)}: {question}...")
+        def fetch_trades(condition_id: str):
+            return self.get_trades_for_market(condition_id, max_trades_per_market)
+
+        # Trades for several markets are fetched concurrently; results come
+        # back in market order
+        market_trades = self._iter_market_trades(markets, fetch_trades)
+
+        self._start_progress()
+        batch = []  # trades of the markets since the last checkpoint
+        for i, (processed_market, n_raw_trades, truncated, market_df) in enumerate(market_trades):
+            if self.verbose:
+                question = markets[i].get('question', 'Unknown')[:60]
+                print(f"\nProcessing market {i+1}/{len(markets)}: {question}...")
 
-            processed_market = self.process_market_for_analysis(market)
             if not processed_market:
                 stats['markets_skipped_no_resolution'] += 1
-                print(f"  Skipped: No valid resolution data")
+                if self.verbose:
+                    print(f"  Skipped: No valid resolution data")
                 continue
 
-            trades, truncated = self.get_trades_for_market(
-                processed_market['condition_id'], max_trades_per_market)
-            note = " (truncated)" if truncated else ""
-
-            if not trades:
+            if market_df is None:
                 stats['markets_skipped_no_trades'] += 1
-                print(f"  Skipped: No trades found")
+                if self.verbose:
+                    print(f"  Skipped: No trades found")
                 continue
 
-            print(f"  Found {len(trades)} trades{note}")
+            if self.verbose:
+                note = " (truncated)" if truncated else ""
+                print(f"  Found {n_raw_trades} trades{note}")
             stats['markets_with_trades'] += 1
 
-            all_trade_data.extend(self._process_trades(trades, processed_market))
+            if len(market_df) > 0:
+                n_trades += len(market_df)
+                batch.append(market_df)
+            del market_df
 
-            # Save progress checkpoint
-            if save_progress and (i + 1) % 50 == 0:
-                temp_df = pd.DataFrame(all_trade_data)
-                temp_df.to_csv(self.output_dir / f'trades_progress_{i+1}.csv', index=False)
-                print(f"\n  Progress saved: {len(all_trade_data):,} trades from {stats['markets_with_trades']} markets")
+            if (i + 1) % CHECKPOINT_EVERY == 0:
+                self._save_progress(batch)
+                batch = []
+                print(f"\n  Progress saved: {n_trades:,} trades from {stats['markets_with_trades']} markets")
+        self._save_progress(batch)
 
-        return all_trade_data, stats
+        return n_trades, stats
 
     def collect_by_time_windows(self,
                                 weeks_back: int = 8,
@@ -293,15 +313,13 @@ class PolymarketSampledCollector(PolymarketDataCollector):
         print(f"\nTotal unique markets: {len(all_markets)}")
 
         if save_raw:
-            with open(self.output_dir / 'raw_markets.json', 'w') as f:
-                json.dump(all_markets, f, indent=2)
+            (self.output_dir / 'raw_markets.json').write_bytes(orjson.dumps(all_markets))
 
         # Phase 2: Collect trades for each market
-        all_trade_data, stats = self._collect_trades_for_markets(
-            all_markets, max_trades_per_market, save_progress=True)
+        _, stats = self._collect_trades_for_markets(all_markets, max_trades_per_market)
 
-        # Phase 3: Save final dataset
-        df = pd.DataFrame(all_trade_data)
+        # Phase 3: Save final dataset, read back once from the checkpoints
+        df = self._read_progress()
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         output_file = self.output_dir / f'polymarket_trades_{timestamp}.csv'
         df.to_csv(output_file, index=False)
@@ -316,7 +334,10 @@ class PolymarketSampledCollector(PolymarketDataCollector):
 
         # Show time distribution
         if len(df) > 0:
-            df['trade_week'] = df['trade_timestamp'].dt.to_period('W')
+            # Monday-start week, kept as a datetime column rather than boxing
+            # every row into a Period (same weeks as to_period('W'))
+            trade_day = df['trade_timestamp'].dt.floor('D')
+            df['trade_week'] = trade_day - pd.to_timedelta(trade_day.dt.dayofweek, unit='D')
             print(f"\nTrades by week:")
             print(df['trade_week'].value_counts().sort_index().tail(10))
             print("=" * 60)
@@ -326,14 +347,13 @@ class PolymarketSampledCollector(PolymarketDataCollector):
 
 def main():
     """Example usage"""
-    collector = PolymarketSampledCollector(output_dir="polymarket_data")
-
-    df = collector.collect_by_time_windows(
-        weeks_back=20,
-        markets_per_window=1000,
-        max_trades_per_market=1000,
-        save_raw=True
-    )
+    with PolymarketSampledCollector(output_dir="polymarket_data") as collector:
+        df = collector.collect_by_time_windows(
+            weeks_back=20,
+            markets_per_window=1000,
+            max_trades_per_market=1000,
+            save_raw=True
+        )
 
     if len(df) > 0:
         print("\nDataset Summary:")
@@ -1,16 +1,30 @@
-import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
 
-# Load full dataset
-df = pd.read_csv('polymarket_data/polymarket_trades_combined_20251230.csv')
+INPUT_FILE = 'polymarket_data/polymarket_trades_combined_20251230.csv'
+
+# Pass 1: read only the market column to pick the sample
+market_ids = pacsv.read_csv(INPUT_FILE, convert_options=pacsv.ConvertOptions(
+    include_columns=['condition_id'], column_types={'condition_id': pa.string()})
+).column('condition_id').to_pandas()
 
 # Sample 1500 markets, keep all their trades
-sampled_markets = df['condition_id'].drop_duplicates().sample(n=1500, random_state=42)
-df_sample = df[df['condition_id'].isin(sampled_markets)]
+sampled_markets = market_ids.drop_duplicates().sample(n=1500, random_state=42)
+
+# Pass 2: scan the file in batches, keeping only the sampled markets' rows,
+# so the full dataset is never held in memory. Every column is read as text
+# so values are written back exactly as they were.
+column_names = pacsv.open_csv(INPUT_FILE).schema.names
+as_text = pacsv.ConvertOptions(column_types={name: pa.string() for name in column_names})
+dataset = ds.dataset(INPUT_FILE, format=ds.CsvFileFormat(convert_options=as_text))
+df_sample = dataset.to_table(
+    filter=ds.field('condition_id').isin(sampled_markets.to_list())).to_pandas()
 
 # Check size
 print(f"Sampled {df_sample['condition_id'].nunique()} markets")
 print(f"Total trades: {len(df_sample):,}")
-print(f"Estimated size: ~{len(df_sample) / len(df) * 1.06:.2f} GB")
+print(f"Estimated size: ~{len(df_sample) / len(market_ids) * 1.06:.2f} GB")
 
 # Save
-df_sample.to_csv('polymarket_trades_sample.csv', index=False)
\ No newline at end of file
+df_sample.to_csv('polymarket_trades_sample.csv', index=False)
@@ -0,0 +1,77 @@
+"""Tests for combine_csvs.py"""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from combine_csvs import combine_csvs
+
+
+def _trades(condition_id: str, category: str, n: int = 3) -> pd.DataFrame:
+    """n trades of one market, in the column layout the collectors write"""
+    return pd.DataFrame({
+        'condition_id': [condition_id] * n,
+        'question': ['Will it happen?'] * n,
+        'category': [category] * n,
+        'trade_timestamp': [f'2024-01-0{k + 1}T00:00:00+00:00' for k in range(n)],
+        'resolved_at': ['2024-02-01T00:00:00+00:00'] * n,
+        'time_to_resolution_hours': [24.0 * (31 - k) for k in range(n)],
+        'price': [0.5 + 0.1 * k for k in range(n)],
+        'size': [10.0] * n,
+        'side': ['BUY'] * n,
+        'outcome': ['Yes'] * n,
+        'won': [True] * n,
+        'volume_total': [1000.0] * n,
+    })
+
+
+class CombineCsvsTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.data_dir = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_empty_category_column_in_one_file(self):
+        market_a = '0x' + 'a' * 64
+        market_b = '0x' + 'b' * 64
+        # Every category in the first file is empty, so pyarrow reads the
+        # column as float; the second file's categories are strings
+        _trades(market_a, '').to_csv(self.data_dir / 'polymarket_trades_1.csv', index=False)
+        pd.concat([_trades(market_a, 'sports').iloc[:1], _trades(market_b, 'sports')]).to_csv(
+            self.data_dir / 'polymarket_trades_2.csv', index=False)
+
+        df = combine_csvs(str(self.data_dir), output_name='combined.parquet')
+
+        # The repeated market_a trade is dropped, keeping its first occurrence
+        self.assertEqual(len(df), 6)
+        by_market = df.groupby('condition_id', observed=True)['category'].agg(
+            lambda s: s.isna().sum())
+        self.assertEqual(by_market[market_a], 3)
+        self.assertEqual(by_market[market_b], 0)
+        self.assertEqual(set(df['category'].dropna()), {'sports'})
+
+        saved = pd.read_parquet(self.data_dir / 'combined.parquet')
+        self.assertEqual(len(saved), 6)
+
+    def test_duplicate_across_timestamp_units(self):
+        market = '0x' + 'c' * 64
+        _trades(market, 'sports').to_csv(self.data_dir / 'polymarket_trades_1.csv', index=False)
+        # One sub-second timestamp makes pyarrow read this file's column in a
+        # finer unit than the first file's; its first trade is a duplicate
+        later = _trades(market, 'sports', n=2)
+        later.loc[1, 'trade_timestamp'] = '2024-01-05T00:00:00.250+00:00'
+        later.to_csv(self.data_dir / 'polymarket_trades_2.csv', index=False)
+
+        df = combine_csvs(str(self.data_dir), output_name='combined.parquet')
+
+        self.assertEqual(len(df), 4)
+        self.assertTrue(df['trade_timestamp'].is_unique)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""Tests for polymarket_analyzer.py"""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from polymarket_analyzer import PolymarketAnalyzer
+
+
+class NarrowColumnsTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        n = 400
+        rng = np.random.default_rng(0)
+        price = rng.integers(1, 100, n) / 100
+        self.trades = pd.DataFrame({
+            'condition_id': [f'0x{k % 7:064x}' for k in range(n)],
+            'question': 'Will it happen?',
+            'category': 'sports',
+            'trade_timestamp': '2024-01-01T00:00:00+00:00',
+            'time_to_resolution_hours': 24.0,
+            'price': price,
+            'size': 10.0,
+            'side': np.where(np.arange(n) % 4, 'BUY', 'SELL'),
+            'outcome': np.where(np.arange(n) % 2, 'Yes', 'No'),
+            'won': rng.random(n) < price,
+        })
+        self.csv_file = Path(self._tmp.name) / 'trades.csv'
+        self.trades.to_csv(self.csv_file, index=False)
+        self.parquet_file = self.csv_file.with_suffix('.parquet')
+        self.trades.to_parquet(self.parquet_file, index=False)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_core_columns_always_loaded(self):
+        full = PolymarketAnalyzer(str(self.csv_file)).calculate_win_rate_by_price(
+            price_bins=10, min_samples=1)
+
+        for data_file in [self.csv_file, self.parquet_file]:
+            analyzer = PolymarketAnalyzer(str(data_file), columns=['price', 'won'])
+            self.assertEqual(set(analyzer.df.columns),
+                             {'condition_id', 'side', 'outcome', 'price', 'won'})
+
+            results = analyzer.calculate_win_rate_by_price(price_bins=10, min_samples=1)
+            pd.testing.assert_frame_equal(results, full)
+
+            yes_analyzer = analyzer._subset(analyzer._is_yes)
+            self.assertTrue(yes_analyzer.df['outcome'].eq('Yes').all())
+
+
+class CacheInvalidationTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        n = 200
+        self.csv_file = Path(self._tmp.name) / 'trades.csv'
+        pd.DataFrame({
+            'condition_id': [f'0x{k % 5:064x}' for k in range(n)],
+            'price': (np.arange(n) % 99 + 1) / 100,
+            'side': 'BUY',
+            'outcome': 'Yes',
+            'won': np.arange(n) % 2 == 0,
+        }).to_csv(self.csv_file, index=False)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_replacing_df_rebuilds_cache(self):
+        analyzer = PolymarketAnalyzer(str(self.csv_file))
+        self.assertGreater(analyzer.calculate_win_rate_by_price(10, 1)['win_rate'].max(), 0)
+
+        analyzer.df = analyzer.df.assign(won=False)
+        self.assertEqual(analyzer.calculate_win_rate_by_price(10, 1)['win_rate'].max(), 0)
+
+    def test_invalidate_after_in_place_change(self):
+        analyzer = PolymarketAnalyzer(str(self.csv_file))
+        self.assertGreater(analyzer.calculate_win_rate_by_price(10, 1)['win_rate'].max(), 0)
+
+        analyzer.df['won'] = False
+        analyzer.invalidate()
+        self.assertEqual(analyzer.calculate_win_rate_by_price(10, 1)['win_rate'].max(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,245 @@
+"""Tests for polymarket_data_collector.py, against a stubbed API"""
+
+import contextlib
+import io
+import json
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+import polymarket_data_collector as pdc
+from polymarket_data_collector import BATCH_SIZE, PolymarketDataCollector
+
+
+def _market(i: int, **overrides) -> dict:
+    """A resolved binary market as the Gamma API returns it"""
+    market = {
+        'conditionId': f'0x{i:064x}',
+        'question': f'Question {i}?',
+        'closed': True,
+        'outcomes': json.dumps(['Yes', 'No']),
+        'outcomePrices': json.dumps(['1', '0'] if i % 2 else ['0', '1']),
+        'createdAt': '2024-01-01T00:00:00Z',
+        'closedTime': '2024-03-01 12:00:00+00',
+        'volumeNum': 1000.0 + i,
+        'category': 'sports',
+    }
+    market.update(overrides)
+    return market
+
+
+def _trade(k: int) -> dict:
+    return {'timestamp': 1704067200 + k * 60, 'price': (k % 99 + 1) / 100,
+            'size': float(k % 7 + 1), 'side': 'BUY' if k % 3 else 'SELL',
+            'outcome': 'Yes' if k % 2 else 'No'}
+
+
+class FakeAPI:
+    """Serves markets and trades for a stubbed _make_request and records every call"""
+
+    def __init__(self, markets: list, n_trades: dict):
+        self.markets = markets
+        self.n_trades = n_trades
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def trades(self, condition_id: str) -> list:
+        """All trades of a market, newest first like the API"""
+        n = self.n_trades.get(condition_id, 0)
+        return [_trade(k) for k in range(n - 1, -1, -1)]
+
+    def __call__(self, url: str, params: dict = None, cache_min_items: int = None):
+        params = params or {}
+        with self._lock:
+            self.calls.append((url, dict(params)))
+        offset, limit = int(params.get('offset', 0)), int(params.get('limit', 100))
+        if url.endswith('/markets'):
+            return self.markets[offset:offset + limit]
+        return self.trades(params['market'])[offset:offset + limit]
+
+    def trade_offsets(self, condition_id: str) -> list:
+        return [params['offset'] for url, params in self.calls
+                if url.endswith('/trades') and params['market'] == condition_id]
+
+
+class CollectorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.collector = PolymarketDataCollector(output_dir=self._tmp.name, verbose=False)
+
+    def tearDown(self):
+        self.collector.close()
+        self._tmp.cleanup()
+
+    def stub_api(self, markets: list, n_trades: dict) -> FakeAPI:
+        api = FakeAPI(markets, n_trades)
+        self.collector._make_request = api
+        return api
+
+
+class IterPagesTest(CollectorTestCase):
+
+    def pages(self, n_items: int, page_size: int = 10, **kwargs):
+        """Pages of an n_items listing and the offsets requested, in request order"""
+        offsets = []
+        lock = threading.Lock()
+
+        def fetch_page(offset):
+            with lock:
+                offsets.append(offset)
+            return list(range(offset, min(offset + page_size, n_items)))
+
+        pages = list(self.collector._iter_pages(fetch_page, page_size, **kwargs))
+        return pages, sorted(offsets)
+
+    def test_pages_in_order_until_short_page(self):
+        pages, _ = self.pages(95)
+        self.assertEqual([page[0] for page in pages], list(range(0, 95, 10)))
+        self.assertEqual(sum(pages, []), list(range(95)))
+
+    def test_stops_on_empty_page(self):
+        pages, _ = self.pages(40)
+        self.assertEqual(sum(pages, []), list(range(40)))
+
+    def test_stops_on_failed_request(self):
+        pages = list(self.collector._iter_pages(
+            lambda offset: None if offset >= 20 else [offset] * 10, 10))
+        self.assertEqual(len(pages), 2)
+
+    def test_no_requests_past_max_items(self):
+        for first_window in [1, 3, 8]:
+            _, offsets = self.pages(1000, max_items=35, first_window=first_window)
+            self.assertEqual(offsets, [0, 10, 20, 30])
+
+    def test_single_page_window_is_serial(self):
+        # A full last page costs one empty request, as serial paging does
+        _, offsets = self.pages(40, max_window=1)
+        self.assertEqual(offsets, [0, 10, 20, 30, 40])
+        _, offsets = self.pages(45, max_window=1)
+        self.assertEqual(offsets, [0, 10, 20, 30, 40])
+
+
+class TradesForMarketTest(CollectorTestCase):
+
+    def test_pages_serially_and_truncates(self):
+        market = _market(0)
+        cid = market['conditionId']
+        api = self.stub_api([market], {cid: 3 * BATCH_SIZE + 7})
+
+        trades, truncated = self.collector.get_trades_for_market(cid)
+        self.assertEqual(trades, api.trades(cid))
+        self.assertFalse(truncated)
+        self.assertEqual(api.trade_offsets(cid), [0, BATCH_SIZE, 2 * BATCH_SIZE, 3 * BATCH_SIZE])
+
+        api.calls.clear()
+        trades, truncated = self.collector.get_trades_for_market(cid, max_trades=BATCH_SIZE + 1)
+        self.assertEqual(trades, api.trades(cid)[:BATCH_SIZE + 1])
+        self.assertTrue(truncated)
+        self.assertEqual(api.trade_offsets(cid), [0, BATCH_SIZE])
+
+
+class MarketTradesTest(CollectorTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.markets = [_market(i) for i in range(30)]
+        self.markets[3] = _market(3, outcomePrices=json.dumps(['0.5', '0.5']))  # unresolved
+        self.markets[7] = _market(7, closed=False)
+        self.markets[11] = _market(11, volumeNum=0)
+        self.n_trades = {m['conditionId']: (i * 137) % 1200 for i, m in enumerate(self.markets)}
+        self.n_trades[self.markets[5]['conditionId']] = 0  # resolved, never traded
+        self.api = self.stub_api(self.markets, self.n_trades)
+
+    def test_market_order_and_skips(self):
+        self.collector.max_concurrent_markets = 4
+        results = list(self.collector._iter_market_trades(
+            self.markets, lambda cid: self.collector.get_trades_for_market(cid)))
+
+        self.assertEqual(len(results), len(self.markets))
+        for i, (processed, n_raw, _, market_df) in enumerate(results):
+            cid = self.markets[i]['conditionId']
+            if i in (3, 7):
+                self.assertIsNone(processed)
+            elif i in (5, 11, 0):
+                # Markets 0 and 5 have no trades; market 11 reports zero volume
+                self.assertEqual(processed['condition_id'], cid)
+                self.assertIsNone(market_df)
+            else:
+                self.assertEqual(n_raw, self.n_trades[cid])
+                self.assertEqual(set(market_df['condition_id']), {cid})
+
+        # Zero-volume and unresolved markets are never requested
+        for i in (3, 7, 11):
+            self.assertEqual(self.api.trade_offsets(self.markets[i]['conditionId']), [])
+
+    def test_collect_dataset_matches_serial_pagination(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            df = self.collector.collect_dataset(num_markets=len(self.markets),
+                                                max_trades_per_market=1000, save_raw=False)
+
+        # Every resolved market's trades in market order, each paged one
+        # request at a time and capped at max_trades_per_market
+        expected = []
+        for i, market in enumerate(self.markets):
+            if i in (3, 7, 11):
+                continue
+            cid = market['conditionId']
+            trades = []
+            offset = 0
+            while len(trades) < 1000:
+                page = self.api.trades(cid)[offset:offset + BATCH_SIZE]
+                trades.extend(page)
+                if len(page) < BATCH_SIZE:
+                    break
+                offset += BATCH_SIZE
+            expected.extend((cid, trade['timestamp'], trade['price']) for trade in trades[:1000])
+
+        got = list(zip(df['condition_id'].astype(str), df['trade_timestamp'].astype('int64') // 10**9,
+                       df['price']))
+        self.assertEqual(got, expected)
+
+        summary = out.getvalue()
+        self.assertIn('Skipped (no resolution): 2', summary)
+        self.assertIn('Skipped (no trades): 3', summary)
+
+        saved = pd.read_parquet(self.collector.output_dir / 'trades_progress')
+        self.assertEqual(len(saved), len(df))
+
+
+class RequestTest(CollectorTestCase):
+
+    def test_response_cache(self):
+        self.collector.cache_dir = self.collector.output_dir / '.http_cache'
+        self.collector.cache_dir.mkdir()
+        response = mock.Mock(content=json.dumps([1, 2, 3]).encode())
+        self.collector._session.get = mock.Mock(return_value=response)
+
+        for _ in range(2):
+            data = self.collector._make_request('https://example.test/trades', {'offset': 0},
+                                                cache_min_items=3)
+            self.assertEqual(data, [1, 2, 3])
+        self.assertEqual(self.collector._session.get.call_count, 1)
+
+        # Short pages may still grow, so they are not cached
+        for _ in range(2):
+            self.collector._make_request('https://example.test/trades', {'offset': 1},
+                                         cache_min_items=4)
+        self.assertEqual(self.collector._session.get.call_count, 3)
+
+    def test_rate_limit_allows_burst_then_waits(self):
+        with mock.patch.object(pdc.time, 'sleep') as sleep:
+            for _ in range(self.collector.max_burst):
+                self.collector._rate_limit()
+            sleep.assert_not_called()
+            self.collector._rate_limit()
+            self.assertEqual(sleep.call_count, 1)
+            self.assertGreater(sleep.call_args[0][0], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,29 +5,107 @@ This script demonstrates how to check if YES contracts are systematically
 priced differently from NO contracts on Polymarket.
 """
 
+import os
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from polymarket_analyzer import PolymarketAnalyzer
 
+def _parquet_copy(csv_file: Path) -> Path:
+    """
+    Path to a Parquet copy of a trades CSV, written on first use
+    
+    The copy sits next to the CSV (so later runs find it as the latest
+    data file) and is rewritten whenever the CSV is newer. Loading it
+    skips CSV parsing, by far the slowest step of a run.
+    """
+    parquet_file = csv_file.with_suffix('.parquet')
+    if not parquet_file.exists() or parquet_file.stat().st_mtime < csv_file.stat().st_mtime:
+        print(f"Converting {csv_file.name} to Parquet...")
+        df = pd.read_csv(csv_file)
+        df['trade_timestamp'] = pd.to_datetime(
+            df['trade_timestamp'], format='ISO8601', cache=True, utc=True)
+        df.to_parquet(parquet_file, engine='pyarrow', compression='zstd', index=False)
+    return parquet_file
+
+
+def _price_sorted_sums(price: np.ndarray, won: np.ndarray):
+    """
+    One side's prices sorted ascending (missing prices last) with prefix
+    sums of wins and prices
+    
+    Every price interval is then a contiguous slice [a, b) found by binary
+    search, and its totals are C[b] - C[a] whatever the interval's size.
+    
+    Returns:
+        Tuple of (sorted prices, cumulative wins, cumulative prices), the
+        sums with a leading 0
+    """
+    order = np.argsort(price, kind='stable')
+    sorted_price = price[order]
+    cum_wins = np.concatenate(([0], np.cumsum(won[order], dtype=np.int64)))
+    cum_price = np.concatenate(([0.0], np.cumsum(sorted_price)))
+    return sorted_price, cum_wins, cum_price
+
+
+def _interval_stats(side: tuple, lows, highs, right_closed: bool = False):
+    """
+    Trade count, win rate and average price in each price interval
+    
+    Args:
+        side: Output of _price_sorted_sums
+        lows, highs: Interval bounds, [low, high) or [low, high] if right_closed
+    
+    Returns:
+        Tuple of (n, win_rate, avg_price) arrays; the rates are NaN for
+        empty intervals
+    """
+    sorted_price, cum_wins, cum_price = side
+    start = np.searchsorted(sorted_price, lows, side='left')
+    stop = np.searchsorted(sorted_price, highs, side='right' if right_closed else 'left')
+    n = stop - start
+    with np.errstate(divide='ignore', invalid='ignore'):
+        win_rate = (cum_wins[stop] - cum_wins[start]) / n
+        avg_price = (cum_price[stop] - cum_price[start]) / n
+    return n, win_rate, avg_price
+
+
+def _format_range_line(side: str, n: int, avg_price: float, win_rate: float, edge: float) -> str:
+    """One side's line of the price-range breakdown"""
+    return (f"  {side} {n:,} trades | "
+            f"Avg price: {avg_price*100:.1f}¢ | "
+            f"Win rate: {win_rate*100:.1f}% | "
+            f"Edge: {edge*100:+.1f}¢")
+
+
 def main():
     """
     Run YES vs NO comparison analysis
     """
     
     # Load most recent data
+    # One directory scan: names are filtered before stat, and each
+    # DirEntry caches its own stat result
     data_dir = Path("polymarket_data")
-    data_files = list(data_dir.glob("polymarket_trades_*.csv"))
+    data_files = []
+    if data_dir.is_dir():
+        with os.scandir(data_dir) as entries:
+            data_files = [(entry.stat().st_mtime, Path(entry.path)) for entry in entries
+                          if entry.name.startswith('polymarket_trades_')
+                          and entry.name.endswith(('.csv', '.parquet'))]
     
     if not data_files:
         print("No data files found!")
         print("Run polymarket_data_collector.py first to collect data.")
         return
     
-    latest_file = max(data_files, key=lambda p: p.stat().st_mtime)
+    _, latest_file = max(data_files)
+    if latest_file.suffix == '.csv':
+        latest_file = _parquet_copy(latest_file)
     print(f"Loading data from: {latest_file}\n")
     
-    # Create analyzer
-    analyzer = PolymarketAnalyzer(str(latest_file))
+    # Create analyzer, loading only the columns this analysis reads
+    analyzer = PolymarketAnalyzer(str(latest_file), columns=['outcome', 'price', 'won'])
     
     # Run YES vs NO analysis
     print("="*70)
@@ -51,37 +129,35 @@ def main():
         (0.7, 1.0, "High probability (70-100¢)")
     ]
     
-    for low, high, label in price_ranges:
-        yes_in_range = analyzer.df[
-            (analyzer.df['outcome'] == 'Yes') & 
-            (analyzer.df['price'] >= low) & 
-            (analyzer.df['price'] < high)
-        ]
-        
-        no_in_range = analyzer.df[
-            (analyzer.df['outcome'] == 'No') & 
-            (analyzer.df['price'] >= low) & 
-            (analyzer.df['price'] < high)
-        ]
-        
-        if len(yes_in_range) > 0 and len(no_in_range) > 0:
-            yes_win_rate = yes_in_range['won'].mean()
-            yes_avg_price = yes_in_range['price'].mean()
+    # Bind the columns used below once, as plain arrays, and split them by
+    # outcome once. Each side is sorted by price with prefix sums, so every
+    # price range or window below costs two binary searches and lookups.
+    outcome = analyzer.df['outcome']
+    price = analyzer.df['price'].to_numpy(dtype=np.float64)
+    won = analyzer.df['won'].to_numpy(dtype=bool)
+    is_yes = outcome.eq('Yes').to_numpy()
+    is_no = outcome.eq('No').to_numpy()
+    yes_side = _price_sorted_sums(price[is_yes], won[is_yes])
+    no_side = _price_sorted_sums(price[is_no], won[is_no])
+    
+    range_lows = [low for low, _, _ in price_ranges]
+    range_highs = [high for _, high, _ in price_ranges]
+    n_yes, yes_win_rates, yes_avg_prices = _interval_stats(yes_side, range_lows, range_highs)
+    n_no, no_win_rates, no_avg_prices = _interval_stats(no_side, range_lows, range_highs)
+    
+    for i, (_, _, label) in enumerate(price_ranges):
+        if n_yes[i] > 0 and n_no[i] > 0:
+            yes_win_rate = yes_win_rates[i]
+            yes_avg_price = yes_avg_prices[i]
             yes_edge = yes_win_rate - yes_avg_price
             
-            no_win_rate = no_in_range['won'].mean()
-            no_avg_price = no_in_range['price'].mean()
+            no_win_rate = no_win_rates[i]
+            no_avg_price = no_avg_prices[i]
             no_edge = no_win_rate - no_avg_price
             
             print(f"\n{label}:")
-            print(f"  YES: {len(yes_in_range):,} trades | "
-                  f"Avg price: {yes_avg_price*100:.1f}¢ | "
-                  f"Win rate: {yes_win_rate*100:.1f}% | "
-                  f"Edge: {yes_edge*100:+.1f}¢")
-            print(f"  NO:  {len(no_in_range):,} trades | "
-                  f"Avg price: {no_avg_price*100:.1f}¢ | "
-                  f"Win rate: {no_win_rate*100:.1f}% | "
-                  f"Edge: {no_edge*100:+.1f}¢")
+            print(_format_range_line('YES:', n_yes[i], yes_avg_price, yes_win_rate, yes_edge))
+            print(_format_range_line('NO: ', n_no[i], no_avg_price, no_win_rate, no_edge))
             
             if abs(yes_edge - no_edge) > 0.05:  # 5¢ difference
                 if yes_edge > no_edge:
@@ -93,12 +169,12 @@ def main():
     print("\nTRADING IMPLICATIONS:")
     print("="*70)
     
-    # Overall comparison
-    yes_all = analyzer.df[analyzer.df['outcome'] == 'Yes']
-    no_all = analyzer.df[analyzer.df['outcome'] == 'No']
-    
-    yes_overall_edge = yes_all['won'].mean() - yes_all['price'].mean()
-    no_overall_edge = no_all['won'].mean() - no_all['price'].mean()
+    # Overall comparison: both outcomes' means from one grouped pass (which,
+    # like Series.mean, skips missing prices)
+    overall = (analyzer.df.groupby('outcome', observed=True)[['won', 'price']].mean()
+               .reindex(['Yes', 'No']))
+    yes_overall_edge = overall.at['Yes', 'won'] - overall.at['Yes', 'price']
+    no_overall_edge = overall.at['No', 'won'] - overall.at['No', 'price']
     
     print(f"\nOverall YES edge: {yes_overall_edge*100:+.2f}¢")
     print(f"Overall NO edge:  {no_overall_edge*100:+.2f}¢")
@@ -126,26 +202,20 @@ def main():
     
     # Test at several price points
     test_prices = [0.3, 0.4, 0.5, 0.6, 0.7]
-    
-    for price in test_prices:
-        complement_price = 1 - price
-        tolerance = 0.05  # ±5¢
-        
-        yes_at_price = analyzer.df[
-            (analyzer.df['outcome'] == 'Yes') &
-            (analyzer.df['price'] >= price - tolerance) &
-            (analyzer.df['price'] <= price + tolerance)
-        ]
-        
-        no_at_complement = analyzer.df[
-            (analyzer.df['outcome'] == 'No') &
-            (analyzer.df['price'] >= complement_price - tolerance) &
-            (analyzer.df['price'] <= complement_price + tolerance)
-        ]
-        
-        if len(yes_at_price) > 30 and len(no_at_complement) > 30:
-            yes_win_rate = yes_at_price['won'].mean()
-            no_win_rate = no_at_complement['won'].mean()
+    complement_prices = [1 - price for price in test_prices]
+    tolerance = 0.05  # ±5¢
+    
+    n_yes, yes_win_rates, _ = _interval_stats(
+        yes_side, np.subtract(test_prices, tolerance), np.add(test_prices, tolerance),
+        right_closed=True)
+    n_no, no_win_rates, _ = _interval_stats(
+        no_side, np.subtract(complement_prices, tolerance), np.add(complement_prices, tolerance),
+        right_closed=True)
+    
+    for i, (price, complement_price) in enumerate(zip(test_prices, complement_prices)):
+        if n_yes[i] > 30 and n_no[i] > 30:
+            yes_win_rate = yes_win_rates[i]
+            no_win_rate = no_win_rates[i]
             
             print(f"YES at {price*100:.0f}¢ vs NO at {complement_price*100:.0f}¢:")
             print(f"  YES win rate: {yes_win_rate*100:.1f}%")